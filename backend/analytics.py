@@ -0,0 +1,138 @@
+# analytics.py
+"""
+Progress analytics maintained incrementally as sessions are saved.
+
+The document is small and precomputed, so the history dashboard can read it
+instead of downloading and aggregating every session client-side. It is
+updated by session_store whenever a session is added.
+"""
+import html
+import re
+
+ANALYTICS_VERSION = 1
+MOVING_WINDOWS = (5, 10)
+# Enough history for any window plus the trend chart
+MAX_TREND_POINTS = 200
+TOP_WEAKNESSES = 5
+# Distinct weakness phrases tracked; the rarest are dropped beyond this
+MAX_WEAKNESS_PHRASES = 500
+
+CATEGORY_KEYWORDS = {
+    "behavioral": (
+        "tell me about", "describe a time", "describe a situation", "conflict", "team", "challenge",
+        "overcame", "strength", "weakness", "failure", "mistake", "disagree", "lead", "motivat",
+    ),
+    "technical": (
+        "design", "optimiz", "algorithm", "database", "system", "scal", "latency", "api", "debug",
+        "architecture", "model", "code", "data structure", "performance", "deploy", "test",
+    ),
+}
+
+
+def categorize_question(question):
+    """
+    Coarse category for a question: "behavioral", "technical" or "general".
+    """
+    text = (question or "").lower()
+    scores = {cat: sum(1 for kw in kws if kw in text) for cat, kws in CATEGORY_KEYWORDS.items()}
+    best = max(scores, key=scores.get)
+    return best if scores[best] > 0 else "general"
+
+
+def extract_weaknesses(overall_summary):
+    """
+    Weakness phrases from a saved overall summary. Handles the dict returned by
+    /summarize_interview and the HTML block the practice page saves.
+    """
+    if isinstance(overall_summary, dict):
+        raw = overall_summary.get("weaknesses", "")
+        if isinstance(raw, list):
+            raw = "<br>".join(str(x) for x in raw)
+    else:
+        text = str(overall_summary or "")
+        match = re.search(r"<h5>\s*Weaknesses\s*</h5>\s*<p>(.*?)</p>", text, re.IGNORECASE | re.DOTALL)
+        if not match:
+            return []
+        raw = match.group(1)
+    phrases = []
+    for part in re.split(r"<br\s*/?>|\n", str(raw)):
+        phrase = html.unescape(re.sub(r"<[^>]+>", "", part)).strip().strip(".-• ").lower()
+        phrase = re.sub(r"\s+", " ", phrase)
+        if phrase and phrase != "—":
+            phrases.append(phrase)
+    return phrases
+
+
+def empty_analytics():
+    return {
+        "version": ANALYTICS_VERSION,
+        "session_count": 0,
+        "score_sum": 0,
+        "average_score": None,
+        "best_score": None,
+        "latest_score": None,
+        "score_trend": [],
+        "moving_averages": {str(w): None for w in MOVING_WINDOWS},
+        "categories": {},
+        "weakness_counts": {},
+        "top_weaknesses": [],
+    }
+
+
+def update_analytics(doc, session):
+    """
+    Fold one saved session into the analytics document (in place) and return it.
+    """
+    score = session.get("total_score") or 0
+    doc["session_count"] += 1
+    doc["score_sum"] += score
+    doc["average_score"] = round(doc["score_sum"] / float(doc["session_count"]), 2)
+    doc["best_score"] = score if doc["best_score"] is None else max(doc["best_score"], score)
+    doc["latest_score"] = score
+
+    trend = doc["score_trend"]
+    recent = [p["total_score"] for p in trend[-(max(MOVING_WINDOWS) - 1):]] + [score]
+    point = {"timestamp": session.get("timestamp"), "total_score": score}
+    for window in MOVING_WINDOWS:
+        values = recent[-window:]
+        avg = round(sum(values) / float(len(values)), 2)
+        point[f"moving_average_{window}"] = avg
+        doc["moving_averages"][str(window)] = avg
+    trend.append(point)
+    del trend[:-MAX_TREND_POINTS]
+
+    for q in session.get("questions", []):
+        category = categorize_question(q.get("question"))
+        stats = doc["categories"].setdefault(category, {"count": 0, "score_sum": 0, "average": None})
+        stats["count"] += 1
+        stats["score_sum"] += q.get("score") or 0
+        stats["average"] = round(stats["score_sum"] / float(stats["count"]), 2)
+
+    counts = doc["weakness_counts"]
+    for phrase in set(extract_weaknesses(session.get("overall_summary"))):
+        counts[phrase] = counts.get(phrase, 0) + 1
+    if len(counts) > MAX_WEAKNESS_PHRASES:
+        for phrase, _ in sorted(counts.items(), key=lambda kv: kv[1])[: len(counts) - MAX_WEAKNESS_PHRASES]:
+            del counts[phrase]
+    doc["top_weaknesses"] = [
+        {"weakness": phrase, "count": count}
+        for phrase, count in sorted(counts.items(), key=lambda kv: (-kv[1], kv[0]))[:TOP_WEAKNESSES]
+    ]
+    return doc
+
+
+def build_analytics(sessions):
+    """
+    Analytics for a full list of sessions (used to seed or rebuild the document).
+    """
+    doc = empty_analytics()
+    for session in sessions:
+        update_analytics(doc, session)
+    return doc
+
+
+def public_view(doc):
+    """
+    The part of the document served to the dashboard (drops internal counters).
+    """
+    return {k: v for k, v in doc.items() if k not in ("score_sum", "weakness_counts")}
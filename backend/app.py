@@ -4,61 +4,83 @@ import traceback
 import io
 import wave
 import contextlib
-import json
 import re
-from flask import Flask, request, jsonify, send_file
+import socket
+import subprocess
+import threading
+import time
+from flask import Flask, request, jsonify, send_file, g, Response
 from higgs_client import (
+    AUDIO_FORMATS,
+    encode_wav_bytes,
+    encoder_available,
     file_bytes_to_wav_bytes,
     transcribe_wav_bytes,
     tts_text_to_wav_bytes,
 )
 from datetime import datetime
-from langchain_community.vectorstores import FAISS
-from langchain_community.embeddings import OpenAIEmbeddings
-from rag_question import PromptingRAGQuestions
-from langchain_community.document_loaders import PyPDFLoader
-from langchain.text_splitter import RecursiveCharacterTextSplitter
+from rag_question import PromptingRAGQuestions, get_embeddings
 from werkzeug.utils import secure_filename
 import tempfile
-from llm_client import summarize_interview_llm, summarize_transcript_llm, analyze_question_llm
-import openai
+from audio_prep import prepare_for_understanding
+from llm_client import (
+    analyze_question_llm,
+    complete,
+    parse_interview_summary,
+    parse_question_analysis,
+    summarize_interview_llm,
+    summarize_transcript_llm,
+)
+from model_router import get_route, verify_models
+from http_cache import init_http_cache
+from followups import submit_partial, get_followup, discard_followup
+from config import WARMUP_ON_START, TTS_CACHE_TTL, LLM_CACHE_TTL, RESUME_INDEX_TTL, SESSION_PAGE_MAX
+from session_store import get_session_store
+from shared_cache import get_cache, make_key
+from tracing import span, start_trace, end_trace, render_metrics, publish_metrics, REQUEST_DURATION
 
 UPLOAD_FOLDER = "./uploaded_resumes"
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 
 app = Flask(__name__, static_folder="../frontend", static_url_path="/")
 
-# In-memory session store (for demo purposes)
-sessions = [
-    {
-        'timestamp': '2025-10-24T15:30:00',
-        'total_score': 4,
-        'questions': [
-            {
-                'question': 'Tell me about yourself?',
-                'response': 'I am a software engineer with 5 years of experience...',
-                'analysis_content': 'Good explanation of experience and skills.',
-                'analysis_delivery': 'Clear voice, moderate pace.',
-                'score': 8
-            },
-            {
-                'question': 'What are your strengths?',
-                'response': 'I am highly analytical and detail-oriented...',
-                'analysis_content': 'Strong examples provided.',
-                'analysis_delivery': 'Slightly fast pace but understandable.',
-                'score': 7
-            },
-            {
-                'question': 'Describe a challenge you overcame.',
-                'response': 'In my last project, we faced a tight deadline...',
-                'analysis_content': 'Well-structured story, shows problem-solving.',
-                'analysis_delivery': 'Good pacing and clarity.',
-                'score': 0
-            }
-        ],
-        'overall_summary': 'Strong content, maintain steady pace in answers. Overall excellent performance.'
-    }
-]
+# Sessions live in session_store (in-memory by default, SQLite when shared by workers)
+
+
+# -------------------- Tracing -------------------- #
+
+@app.before_request
+def _begin_request_trace():
+    g.request_start = time.perf_counter()
+    start_trace(f"{request.method} {request.path}")
+
+
+@app.after_request
+def _finish_request_trace(response):
+    elapsed = time.perf_counter() - g.get("request_start", time.perf_counter())
+    endpoint = request.url_rule.rule if request.url_rule else "<unmatched>"
+    REQUEST_DURATION.observe(elapsed, endpoint=endpoint, method=request.method, status=response.status_code)
+    trace = end_trace(status=response.status_code)
+    if trace is not None:
+        response.headers["X-Trace-Id"] = trace["trace_id"]
+    publish_metrics()
+    return response
+
+
+@app.teardown_request
+def _drop_request_trace(exc):
+    # after_request is skipped on unhandled errors; make sure the trace is closed
+    end_trace(status=500 if exc else None)
+
+
+# after_request hooks run in reverse registration order: registering this after the
+# tracing hooks makes compression run first, inside the request trace and duration
+init_http_cache(app)
+
+
+@app.route("/metrics")
+def metrics():
+    return Response(render_metrics(), mimetype="text/plain; version=0.0.4")
 
 
 # -------------------- Routes -------------------- #
@@ -68,21 +90,113 @@ def index():
     return app.send_static_file("index.html")
 
 def create_vector_db_from_pdf(uploaded_file):
+    # Heavy imports are deferred to first use to keep worker boot fast
+    from langchain_community.vectorstores import FAISS
+    from langchain_community.document_loaders import PyPDFLoader
+    from langchain.text_splitter import RecursiveCharacterTextSplitter
+
     # Load the PDF using PyPDFLoader
-    loader = PyPDFLoader(uploaded_file)
-    documents = loader.load()
+    with span("pdf_load") as attrs:
+        loader = PyPDFLoader(uploaded_file)
+        documents = loader.load()
+        attrs["pages"] = len(documents)
 
     # Split into chunks
-    splitter = RecursiveCharacterTextSplitter(chunk_size=500, chunk_overlap=50)
-    chunks = splitter.split_documents(documents)
+    with span("pdf_split") as attrs:
+        splitter = RecursiveCharacterTextSplitter(chunk_size=500, chunk_overlap=50)
+        chunks = splitter.split_documents(documents)
+        attrs["chunks"] = len(chunks)
 
-    # Create FAISS vector DB
-    embeddings = OpenAIEmbeddings()
-    vector_db = FAISS.from_documents(chunks, embeddings)
+    # Create FAISS vector DB (embeds every chunk, then builds the index)
+    with span("embed.resume_index", chunks=len(chunks)):
+        vector_db = FAISS.from_documents(chunks, get_embeddings())
 
     return vector_db
 
-rag_generator = PromptingRAGQuestions()  # default stateless
+
+def load_resume_index(pdf_bytes):
+    """
+    FAISS index for a resume, built once per distinct PDF and shared by all
+    workers through the cache (the same resume uploaded twice is not re-embedded).
+    """
+    from langchain_community.vectorstores import FAISS
+
+    def build():
+        # Built from the bytes the key was computed from, via a private temp file;
+        # the shared upload path can be overwritten by a concurrent upload
+        fd, path = tempfile.mkstemp(suffix=".pdf")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(pdf_bytes)
+            return create_vector_db_from_pdf(path).serialize_to_bytes()
+        finally:
+            os.remove(path)
+
+    serialized = get_cache().get_or_create("resume_index", make_key(pdf_bytes), build, ttl=RESUME_INDEX_TTL)
+    with span("resume_index.load", bytes=len(serialized)):
+        return FAISS.deserialize_from_bytes(
+            serialized=serialized,
+            embeddings=get_embeddings(),
+            allow_dangerous_deserialization=True,  # produced by this server, never by clients
+        )
+
+
+_rag_generator = None
+_rag_generator_lock = threading.Lock()
+
+
+def get_rag_generator():
+    """
+    Shared resume-less generator. Building it embeds an empty document, so it is
+    created on first use (or by warm_up) instead of at import time.
+    """
+    global _rag_generator
+    if _rag_generator is None:
+        with _rag_generator_lock:
+            if _rag_generator is None:
+                _rag_generator = PromptingRAGQuestions()  # default stateless
+    return _rag_generator
+
+
+def warm_up():
+    """
+    Import the heavy dependencies and build the model clients ahead of the first request.
+    """
+    import higgs_client
+    import llm_client
+    with span("warmup"):
+        try:
+            higgs_client.get_client()
+            llm_client.get_client()
+            # Check the routed models are served before the first request needs them
+            verify_models()
+            # Modules used by create_vector_db_from_pdf
+            import langchain_community.vectorstores  # noqa: F401
+            import langchain_community.document_loaders  # noqa: F401
+            import langchain.text_splitter  # noqa: F401
+            get_rag_generator()
+        except Exception:
+            traceback.print_exc()
+
+
+def start_background_warmup(port, host="127.0.0.1", timeout=30.0):
+    """
+    Run warm_up on a daemon thread once the server is accepting connections,
+    so warm-up never delays binding the port.
+    """
+    def wait_then_warm():
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            try:
+                with socket.create_connection((host, port), timeout=0.5):
+                    break
+            except OSError:
+                time.sleep(0.1)
+        warm_up()
+
+    thread = threading.Thread(target=wait_then_warm, name="warmup", daemon=True)
+    thread.start()
+    return thread
 
 def clean_question_response(raw_text):
     """
@@ -138,19 +252,25 @@ def question():
         if resume_file:
             filename = secure_filename(resume_file.filename)
             resume_path = os.path.join(UPLOAD_FOLDER, filename)
-            resume_file.save(resume_path)
-            vector_db = create_vector_db_from_pdf(resume_path)
+            pdf_bytes = resume_file.read()
+            with open(resume_path, "wb") as f:
+                f.write(pdf_bytes)
+            vector_db = load_resume_index(pdf_bytes)
 
         # Generate questions
-        rag_generator_with_resume = PromptingRAGQuestions(vector_db=vector_db)
-        questions_list = rag_generator_with_resume.generate_questions(role, additional_note)
+        if vector_db is None:
+            generator = get_rag_generator()
+        else:
+            generator = PromptingRAGQuestions(vector_db=vector_db)
+        questions_list = generator.generate_questions(role, additional_note)
 
-        if isinstance(questions_list, list) and len(questions_list) == 1:
-            questions_list = questions_list[0]['question']
+        with span("parse.question_response"):
+            if isinstance(questions_list, list) and len(questions_list) == 1:
+                questions_list = questions_list[0]['question']
 
-        # Clean output: ensure it's always a Python list of dicts
-        if isinstance(questions_list, str):
-            questions_list = clean_question_response(questions_list)
+            # Clean output: ensure it's always a Python list of dicts
+            if isinstance(questions_list, str):
+                questions_list = clean_question_response(questions_list)
 
         # By now, questions_list is a proper Python list
         return jsonify({"questions": questions_list})
@@ -161,6 +281,50 @@ def question():
         return jsonify({"error": str(e)}), 500
 
 
+# Formats /tts can return; WAV first so clients sending */* keep getting WAV
+TTS_FORMATS = ["wav", "opus", "mp3"]
+TTS_MIMETYPES = {"wav": "audio/wav", "opus": AUDIO_FORMATS["opus"][0], "mp3": AUDIO_FORMATS["mp3"][0]}
+
+
+def negotiate_tts_format(requested=None):
+    """
+    Pick the /tts output format from an explicit `format` field, else the Accept header.
+    Formats this host's ffmpeg cannot encode are never picked; WAV always works.
+    """
+    available = [f for f in TTS_FORMATS if encoder_available(f)]
+    if requested:
+        requested = requested.lower()
+        aliases = {"webm": "opus", "mpeg": "mp3", "wave": "wav"}
+        requested = aliases.get(requested, requested)
+        return requested if requested in available else "wav"
+    offered = [TTS_MIMETYPES[f] for f in available]
+    best = request.accept_mimetypes.best_match(offered, default="audio/wav")
+    return next(f for f in available if TTS_MIMETYPES[f] == best)
+
+
+def get_tts_audio(text, voice, audio_format="wav"):
+    """
+    TTS audio in the given format. The WAV and every encoded form are cached
+    separately, so each is synthesized/encoded once and then served from cache.
+    """
+    cache = get_cache()
+    key = make_key(voice, text)
+    wav_bytes = cache.get_or_create(
+        "tts",
+        key,
+        lambda: tts_text_to_wav_bytes(text, voice=voice),
+        ttl=TTS_CACHE_TTL,
+    )
+    if audio_format == "wav":
+        return wav_bytes
+    return cache.get_or_create(
+        f"tts_{audio_format}",
+        key,
+        lambda: encode_wav_bytes(wav_bytes, audio_format),
+        ttl=TTS_CACHE_TTL,
+    )
+
+
 @app.route("/tts", methods=["POST"])
 def tts():
     try:
@@ -170,13 +334,24 @@ def tts():
         if not text:
             return jsonify({"error": "text required"}), 400
 
-        wav_bytes = tts_text_to_wav_bytes(text, voice=voice)
-        return send_file(
-            io.BytesIO(wav_bytes),
-            mimetype="audio/wav",
+        audio_format = negotiate_tts_format(data.get("format"))
+        try:
+            audio_bytes = get_tts_audio(text, voice, audio_format)
+        except (OSError, subprocess.CalledProcessError) as e:
+            # The encoder was detected but failed on this input: WAV always works
+            print(f"[tts] {audio_format} encoding failed ({e!r}); serving WAV")
+            audio_format = "wav"
+            audio_bytes = get_tts_audio(text, voice, audio_format)
+
+        ext = "wav" if audio_format == "wav" else AUDIO_FORMATS[audio_format][1]
+        response = send_file(
+            io.BytesIO(audio_bytes),
+            mimetype=TTS_MIMETYPES[audio_format],
             as_attachment=False,
-            download_name="tts.wav"
+            download_name=f"tts.{ext}"
         )
+        response.headers["Vary"] = "Accept"
+        return response
         # # Streaming Version
         # # TODO: add voice in streaming
         # def generate():
@@ -243,36 +418,49 @@ def upload_answer():
 
         # Get audio duration
         duration = None
-        try:
-            with contextlib.closing(wave.open(io.BytesIO(wav_bytes), 'rb')) as wf:
-                frames = wf.getnframes()
-                rate = wf.getframerate()
-                duration = frames / float(rate)
-        except Exception:
-            duration = None
+        with span("parse.wav_header"):
+            try:
+                with contextlib.closing(wave.open(io.BytesIO(wav_bytes), 'rb')) as wf:
+                    frames = wf.getnframes()
+                    rate = wf.getframerate()
+                    duration = frames / float(rate)
+            except Exception:
+                duration = None
+
+        # Trim silence, split and (optionally) compress before upload
+        chunks, payload_stats = prepare_for_understanding(wav_bytes)
 
         # -------------------- Separate API calls -------------------- #
 
-        # 1. Transcribe audio
-        transcript = transcribe_wav_bytes(
-            wav_bytes,
-            file_format="wav",
-            system_prompt="Please transcribe this audio exactly as spoken."
+        # 1. Transcribe audio (chunk by chunk for long answers)
+        transcript = " ".join(
+            transcribe_wav_bytes(
+                chunk,
+                file_format=chunk_format,
+                system_prompt="Please transcribe this audio exactly as spoken."
+            ).strip()
+            for chunk, chunk_format in chunks
         ).strip()
 
         # 2. Analyze audio (speaker characteristics, tone, background noise, etc.)
-        analysis_text = transcribe_wav_bytes(
-            wav_bytes,
-            file_format="wav",
-            system_prompt=(
-                "Analyze the audio for speaker characteristics, clarity, tone, "
-                "background noise, pitch, speech rate, and pronunciation. "
-                "Do NOT include the transcript, only the analysis."
-            )
+        analysis_text = "\n\n".join(
+            transcribe_wav_bytes(
+                chunk,
+                file_format=chunk_format,
+                system_prompt=(
+                    "Analyze the audio for speaker characteristics, clarity, tone, "
+                    "background noise, pitch, speech rate, and pronunciation. "
+                    "Do NOT include the transcript, only the analysis."
+                )
+            ).strip()
+            for chunk, chunk_format in chunks
         ).strip()
 
         analysis = {
             "duration_seconds": duration,
+            "speech_seconds": payload_stats.get("speech_seconds"),
+            # True when the answer ran past MAX_ANSWER_SECONDS with chunking disabled
+            "capped": payload_stats.get("capped", False),
             "analysis_text": analysis_text,
         }
 
@@ -286,6 +474,72 @@ def upload_answer():
         return jsonify({"error": str(e)}), 500
 
 
+# === Adaptive mode: speculative follow-ups ===
+def tts_prefetcher(voice, audio_format):
+    """
+    Callable that synthesizes text into the TTS cache, as /tts would serve it.
+    """
+    def synthesize(text):
+        try:
+            get_tts_audio(text, voice, audio_format)
+        except (OSError, subprocess.CalledProcessError):
+            get_tts_audio(text, voice, "wav")
+    return synthesize
+
+
+@app.route("/partial_answer", methods=["POST"])
+def partial_answer():
+    """
+    Audio recorded so far for the current answer. Starts a background job that
+    prepares a follow-up question (text + TTS audio); poll it with /followup.
+    Form fields: file, slot (answer id), seq (increasing per slot), question, voice.
+    The TTS format is negotiated from `format` / Accept exactly as for /tts.
+    """
+    try:
+        if "file" not in request.files:
+            return jsonify({"error": "file required"}), 400
+        slot = request.form.get("slot", "")
+        if not re.fullmatch(r"[A-Za-z0-9_-]{1,64}", slot):
+            return jsonify({"error": "valid slot required"}), 400
+        try:
+            seq = int(request.form.get("seq", "0"))
+        except ValueError:
+            return jsonify({"error": "seq must be an integer"}), 400
+
+        f = request.files["file"]
+        ext = (f.filename or "partial.webm").split(".")[-1].lower() or "webm"
+        voice = request.form.get("voice", "en_woman_1")
+        accepted = submit_partial(
+            slot,
+            seq,
+            f.read(),
+            ext,
+            request.form.get("question", ""),
+            role=request.form.get("role", ""),
+            synthesize=tts_prefetcher(voice, negotiate_tts_format(request.form.get("format"))),
+        )
+        return jsonify({"status": "accepted" if accepted else "stale", "seq": seq}), 202 if accepted else 200
+    except Exception as e:
+        traceback.print_exc()
+        return jsonify({"error": str(e)}), 500
+
+
+@app.route("/followup", methods=["GET", "DELETE"])
+def followup():
+    """
+    GET: state of the speculative follow-up for `slot`.
+    DELETE: clear it once the page has used it (used=1) or decided not to ask it.
+    """
+    slot = request.args.get("slot", "")
+    if request.method == "DELETE":
+        discard_followup(slot, used=request.args.get("used") == "1")
+        return jsonify({"status": "discarded"})
+    state = get_followup(slot)
+    if state is None:
+        return jsonify({"status": "none", "followup": None})
+    return jsonify(state)
+
+
 @app.route("/summary", methods=["POST"])
 def summary():
     try:
@@ -311,29 +565,10 @@ def analyze_question():
 
         raw_analysis = analyze_question_llm(question, response)
 
-        text = raw_analysis["text"]
-
-        # Step 1: Remove everything before </think>
-        if "</think>" in text:
-            raw_analysis = text.split("</think>", 1)[1]
-
-        # Step 2: Extract analysis_content
-        match_content = re.search(r'"analysis_content"\s*:\s*"(.*?)"\s*,\s*"analysis_delivery"', raw_analysis, re.DOTALL)
-        analysis_content = match_content.group(1) if match_content else ""
+        with span("parse.analysis"):
+            analysis = parse_question_analysis(raw_analysis)
 
-        # Step 3: Extract analysis_delivery
-        match_delivery = re.search(r'"analysis_delivery"\s*:\s*"(.*?)"\s*,\s*"score"', raw_analysis, re.DOTALL)
-        analysis_delivery = match_delivery.group(1) if match_delivery else ""
-
-        # Step 4: Extract score (integer)
-        match_score = re.search(r'"score"\s*:\s*(\d+)', raw_analysis)
-        score = int(match_score.group(1)) if match_score else None
-
-        return jsonify({
-            "analysis_content": analysis_content,
-            "analysis_delivery": analysis_delivery,
-            "score": score
-        })
+        return jsonify(analysis)
 
     except Exception as e:
         traceback.print_exc()
@@ -350,21 +585,8 @@ def summarize_interview():
         result = summarize_interview_llm(questions)
 
         # process result
-        # Keep only content after </think>
-        result = result["text"]
-        if "</think>" in result:
-            result = result.split("</think>", 1)[1].strip()
-
-        # Try parsing as JSON (in case it's a JSON string)
-        try:
-            summary = json.loads(result)
-        except json.JSONDecodeError:
-            summary = {"text": result}  # fallback as plain text
-
-        # Convert lists to HTML strings
-        for key in ["strengths", "weaknesses", "tips"]:
-            if key in summary and isinstance(summary[key], list):
-                summary[key] = "<br>".join(summary[key])
+        with span("parse.interview_summary"):
+            summary = parse_interview_summary(result)
 
         # Now summary is safe to send to frontend
         return jsonify({"overall_summary": summary})
@@ -378,12 +600,15 @@ def summarize_interview():
 @app.route("/save_session", methods=["POST"])
 def save_session():
     data = request.json
-    questions = data.get("questions", [])
-    
-    if not questions or len(questions) != 3:
-        return jsonify({"error": "Must have exactly 3 questions"}), 400
+    questions = [q for q in data.get("questions", []) if q]
+    # Adaptive mode adds follow-ups between the three main questions
+    main_questions = [q for q in questions if not q.get("is_followup")]
+
+    if len(main_questions) != 3:
+        return jsonify({"error": "Must have exactly 3 main questions"}), 400
 
-    total_score = sum(q.get("score", 0) for q in questions)
+    # Scored on the main questions so adaptive and fixed sessions stay comparable
+    total_score = sum(q.get("score", 0) for q in main_questions)
     timestamp = datetime.now().isoformat()
     overall_summary = data.get("overall_summary", "")
 
@@ -394,49 +619,79 @@ def save_session():
         "overall_summary": overall_summary
     }
 
-    sessions.append(session)
+    get_session_store().add(session)
     return jsonify({"status": "success", "session": session})
 
 # === Endpoint: get session history ===
 @app.route("/session_history", methods=["GET"])
 def get_session_history():
-    return jsonify({"sessions": sessions})
-
-
-# === Endpoint: give comment ===
-@app.route("/give_comment", methods=["GET"])
-def give_comment():
+    """
+    Without arguments: every session, oldest first.
+    With ?limit=N[&offset=M]: one page, newest first, plus the total count.
+    """
+    store = get_session_store()
+    if "limit" not in request.args:
+        return jsonify({"sessions": store.all()})
     try:
-        comments = []
+        limit = min(max(int(request.args["limit"]), 1), SESSION_PAGE_MAX)
+        offset = max(int(request.args.get("offset", 0)), 0)
+    except ValueError:
+        return jsonify({"error": "limit and offset must be integers"}), 400
+    return jsonify({"sessions": store.page(limit, offset), "total": store.count(), "offset": offset, "limit": limit})
 
-        client = openai.OpenAI()
+# === Endpoint: progress analytics ===
+@app.route("/analytics", methods=["GET"])
+def get_analytics():
+    # Precomputed on save_session, so this stays cheap as history grows
+    return jsonify(get_session_store().analytics())
 
-        for session in sessions:
-            summary_text = session.get("overall_summary", "")
 
-            # Prompt GPT-4o-mini
-            prompt = f"""
+# === Endpoint: give comment ===
+def session_comment(session):
+    """
+    Short coaching comment for one saved session, cached per summary.
+    """
+    summary_text = session.get("overall_summary", "")
+    cache = get_cache()
+    cache_key = make_key(get_route("comment")["model"], summary_text)
+    cached = cache.get_json("comment", cache_key)
+    if cached is not None:
+        return cached
+
+    # Prompt the "comment" route (GPT-4o-mini by default)
+    prompt = f"""
 You are a friendly interview coach. 
 Based on this session summary, give a 2-3 line comment that encourages the candidate or gives a small tip:
 
 Summary: {summary_text}
 """
-            response = client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[
-                    {"role": "system", "content": "You are a friendly interview coach."},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.7,
-                max_tokens=60
-            )
-
-            comment_text = response.choices[0].message.content.strip()
-            comments.append({
-                "timestamp": session["timestamp"],
-                "comment": comment_text
-            })
+    comment_text = complete("comment", [
+        {"role": "system", "content": "You are a friendly interview coach."},
+        {"role": "user", "content": prompt}
+    ])
+    cache.set_json("comment", cache_key, comment_text, ttl=LLM_CACHE_TTL)
+    return comment_text
+
+
+@app.route("/give_comment", methods=["GET"])
+def give_comment():
+    """
+    ?timestamp=...: comment for that session. ?latest=1: for the newest session.
+    Without arguments: one comment per session.
+    """
+    try:
+        store = get_session_store()
+        if "timestamp" in request.args:
+            session = store.find(request.args["timestamp"])
+            if session is None:
+                return jsonify({"error": "session not found"}), 404
+            sessions = [session]
+        elif request.args.get("latest") == "1":
+            sessions = store.page(1)
+        else:
+            sessions = store.all()
 
+        comments = [{"timestamp": s["timestamp"], "comment": session_comment(s)} for s in sessions]
         return jsonify({"comments": comments})
 
     except Exception as e:
@@ -447,4 +702,7 @@ Summary: {summary_text}
 # -------------------- Main -------------------- #
 if __name__ == "__main__":
     print("BOSON_API_BASE:", os.getenv("BOSON_API_BASE"))
+    # With debug=True the reloader parent never serves requests; only warm the child
+    if WARMUP_ON_START and os.environ.get("WERKZEUG_RUN_MAIN") == "true":
+        start_background_warmup(5000)
     app.run(host="0.0.0.0", port=5000, debug=True)
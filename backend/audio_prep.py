@@ -0,0 +1,145 @@
+# audio_prep.py
+"""
+Shrink answer recordings before they are sent to the audio-understanding model.
+
+The model receives audio base64-encoded inside a JSON body, twice per answer
+(transcript + delivery analysis), so every second of silence and every byte of
+container overhead is paid for twice. prepare_for_understanding() trims leading
+and trailing silence, splits what is left into chunks, and optionally
+re-encodes each chunk (FLAC/MP3) via the `file_format` argument of
+transcribe_wav_bytes. Only without chunking are overly long answers capped,
+and stats["capped"] tells the caller that speech was dropped.
+"""
+import contextlib
+import io
+import subprocess
+import wave
+from config import (
+    UNDERSTANDING_AUDIO_FORMAT,
+    SILENCE_THRESHOLD_DBFS,
+    MAX_ANSWER_SECONDS,
+    UNDERSTANDING_CHUNK_SECONDS,
+)
+from higgs_client import encode_wav_bytes
+from tracing import span
+
+FRAME_MS = 20
+# Silence kept around speech so word onsets/endings are not clipped
+PAD_MS = 250
+
+
+def read_wav(wav_bytes):
+    """
+    Return (params, pcm bytes) for a WAV blob.
+    """
+    with contextlib.closing(wave.open(io.BytesIO(wav_bytes), "rb")) as wf:
+        return wf.getparams(), wf.readframes(wf.getnframes())
+
+
+def write_wav(params, pcm):
+    buf = io.BytesIO()
+    with wave.open(buf, "wb") as wf:
+        wf.setnchannels(params.nchannels)
+        wf.setsampwidth(params.sampwidth)
+        wf.setframerate(params.framerate)
+        wf.writeframes(pcm)
+    return buf.getvalue()
+
+
+def tail_wav(wav_bytes, seconds):
+    """
+    The last `seconds` of a WAV blob (unchanged if shorter or unparseable).
+    """
+    try:
+        params, pcm = read_wav(wav_bytes)
+    except (wave.Error, EOFError):
+        return wav_bytes
+    keep = int(seconds * params.framerate) * params.sampwidth * params.nchannels
+    if not seconds or len(pcm) <= keep:
+        return wav_bytes
+    return write_wav(params, pcm[-keep:])
+
+
+def speech_bounds(params, pcm, threshold_dbfs=SILENCE_THRESHOLD_DBFS):
+    """
+    (start_frame, end_frame) of the region whose 20 ms RMS exceeds the threshold,
+    padded by PAD_MS. Returns (0, 0) when the whole recording is silent.
+    Only 16-bit PCM is analysed; other widths are returned untrimmed.
+    """
+    total = len(pcm) // (params.sampwidth * params.nchannels)
+    if params.sampwidth != 2 or total == 0:
+        return 0, total
+
+    import numpy as np  # deferred: numpy is not needed to import the app
+
+    samples = np.frombuffer(pcm[: total * 2 * params.nchannels], dtype="<i2").astype(np.float32)
+    if params.nchannels > 1:
+        samples = samples.reshape(-1, params.nchannels).mean(axis=1)
+    frame_len = max(1, params.framerate * FRAME_MS // 1000)
+    n_frames = len(samples) // frame_len
+    if n_frames == 0:
+        return 0, total
+    frames = samples[: n_frames * frame_len].reshape(n_frames, frame_len)
+    rms = np.sqrt(np.mean(frames * frames, axis=1)) / 32768.0
+    threshold = 10 ** (threshold_dbfs / 20.0)
+    loud = np.nonzero(rms > threshold)[0]
+    if len(loud) == 0:
+        return 0, 0
+    pad = params.framerate * PAD_MS // 1000
+    start = max(0, int(loud[0]) * frame_len - pad)
+    end = min(total, (int(loud[-1]) + 1) * frame_len + pad)
+    return start, end
+
+
+def prepare_for_understanding(wav_bytes, audio_format=UNDERSTANDING_AUDIO_FORMAT,
+                              max_seconds=MAX_ANSWER_SECONDS, chunk_seconds=UNDERSTANDING_CHUNK_SECONDS):
+    """
+    Trim, split and encode a WAV answer for the understanding model (capped at
+    max_seconds only when chunk_seconds is 0).
+    Returns (chunks, stats) where chunks is a list of (audio_bytes, file_format).
+    Falls back to the untouched WAV if it cannot be parsed.
+    """
+    try:
+        params, pcm = read_wav(wav_bytes)
+    except (wave.Error, EOFError):
+        return [(wav_bytes, "wav")], {"original_bytes": len(wav_bytes), "payload_bytes": len(wav_bytes)}
+
+    bytes_per_frame = params.sampwidth * params.nchannels
+    total_frames = len(pcm) // bytes_per_frame
+    with span("audio_prep.trim", frames=total_frames):
+        start, end = speech_bounds(params, pcm)
+    if end <= start:
+        # Silent answer: send a short clip rather than nothing so the model can say so
+        start, end = 0, min(total_frames, params.framerate)
+
+    capped = False
+    if max_seconds and not chunk_seconds and (end - start) > max_seconds * params.framerate:
+        end = start + int(max_seconds * params.framerate)
+        capped = True
+
+    chunk_frames = int(chunk_seconds * params.framerate) if chunk_seconds else end - start
+    chunks = []
+    for offset in range(start, end, max(1, chunk_frames)):
+        piece = pcm[offset * bytes_per_frame: min(end, offset + chunk_frames) * bytes_per_frame]
+        chunk_wav = write_wav(params, piece)
+        file_format = audio_format
+        if audio_format != "wav":
+            try:
+                chunk_wav = encode_wav_bytes(chunk_wav, audio_format)
+            except (OSError, subprocess.CalledProcessError):
+                # ffmpeg unavailable: keep the (already trimmed) WAV
+                file_format = "wav"
+        chunks.append((chunk_wav, file_format))
+    if not chunks:
+        chunks = [(wav_bytes, "wav")]
+
+    stats = {
+        "original_bytes": len(wav_bytes),
+        "original_seconds": round(total_frames / float(params.framerate), 3),
+        "speech_seconds": round((end - start) / float(params.framerate), 3),
+        "capped": capped,
+        "chunks": len(chunks),
+        "format": chunks[0][1] if chunks else "wav",
+        "payload_bytes": sum(len(c) for c, _ in chunks),
+    }
+    return chunks, stats
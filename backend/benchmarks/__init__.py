@@ -0,0 +1,10 @@
+# benchmarks/__init__.py
+"""
+Offline benchmarks for the interview backend.
+
+    mock_server  - local OpenAI/Boson-compatible endpoints (chat, speech, embeddings)
+    run          - scenario driver reporting p50/p95/p99 latency and throughput
+    importtime   - `-X importtime` summary of `import app`, fails on startup regressions
+    audio_codecs - bytes and encode cost per second of audio for each /tts format
+    audio_payload- request-size reduction and WER effect of audio_prep on fixtures
+"""
@@ -0,0 +1,69 @@
+# benchmarks/audio_codecs.py
+"""
+Bytes and encode cost per second of audio for each /tts output format.
+
+    python -m benchmarks.audio_codecs                 # synthetic 24 kHz tone
+    python -m benchmarks.audio_codecs --wav tts.wav   # a real /tts response
+
+Requires ffmpeg with libopus and libmp3lame.
+"""
+import argparse
+import contextlib
+import io
+import time
+import wave
+from benchmarks.common import synthetic_wav
+from higgs_client import encode_wav_bytes
+
+FORMATS = ["wav", "opus", "mp3", "flac"]
+
+
+def wav_duration(wav_bytes):
+    with contextlib.closing(wave.open(io.BytesIO(wav_bytes), "rb")) as wf:
+        return wf.getnframes() / float(wf.getframerate())
+
+
+def measure_format(wav_bytes, audio_format, repeats=5):
+    """
+    Encode `repeats` times; return bytes/s of audio, compression ratio and encode ms per audio second.
+    """
+    seconds = wav_duration(wav_bytes)
+    timings = []
+    encoded = wav_bytes
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        encoded = encode_wav_bytes(wav_bytes, audio_format)
+        timings.append(time.perf_counter() - t0)
+    best = min(timings)
+    return {
+        "format": audio_format,
+        "audio_seconds": round(seconds, 2),
+        "bytes": len(encoded),
+        "bytes_per_audio_second": round(len(encoded) / seconds),
+        "ratio_vs_wav": round(len(wav_bytes) / len(encoded), 2),
+        "encode_ms_per_audio_second": round(best * 1000.0 / seconds, 3),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare /tts output formats.")
+    parser.add_argument("--wav", help="WAV file to encode (default: synthetic 24 kHz audio)")
+    parser.add_argument("--seconds", type=float, default=10.0, help="length of the synthetic audio")
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    if args.wav:
+        with open(args.wav, "rb") as f:
+            wav_bytes = f.read()
+    else:
+        wav_bytes = synthetic_wav(args.seconds, sample_rate=24000)
+
+    print(f"{'format':<6} {'bytes/s':>9} {'ratio':>6} {'encode ms/s':>12}")
+    for audio_format in FORMATS:
+        row = measure_format(wav_bytes, audio_format, args.repeats)
+        print(f"{row['format']:<6} {row['bytes_per_audio_second']:>9} {row['ratio_vs_wav']:>6} "
+              f"{row['encode_ms_per_audio_second']:>12}")
+
+
+if __name__ == "__main__":
+    main()
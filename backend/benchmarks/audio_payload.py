@@ -0,0 +1,133 @@
+# benchmarks/audio_payload.py
+"""
+Payload-size reduction (and transcript accuracy) of audio_prep on a fixture set.
+
+    python -m benchmarks.audio_payload --fixtures ./fixtures/answers
+    python -m benchmarks.audio_payload --fixtures ./fixtures/answers --transcribe --format flac
+
+A fixture is any .wav/.webm/.mp3 file; an optional <name>.txt next to it holds
+the reference transcript. With --transcribe both the original and the prepared
+audio are sent to the understanding model (point BOSON_API_BASE at the mock
+server or the real endpoint) and word error rates are compared. Without
+fixtures a few synthetic answers with silence padding are used (sizes only).
+
+Savings are split into silence trimming (prepared WAV vs original) and
+re-encoding (--format vs the prepared WAV). Both model calls (transcript and
+delivery analysis) send every chunk, so nothing is counted as saved by
+dropping audio.
+"""
+import argparse
+import base64
+import os
+import re
+from benchmarks.common import synthetic_wav
+from audio_prep import prepare_for_understanding
+from higgs_client import file_bytes_to_wav_bytes, transcribe_wav_bytes
+
+AUDIO_EXTENSIONS = (".wav", ".wave", ".webm", ".mp3", ".ogg", ".m4a")
+TRANSCRIBE_PROMPT = "Please transcribe this audio exactly as spoken."
+
+
+def request_bytes(audio_bytes):
+    """
+    Size of the audio as it travels inside the chat.completions JSON body.
+    """
+    return len(base64.b64encode(audio_bytes))
+
+
+def word_error_rate(reference, hypothesis):
+    ref = re.findall(r"[a-z0-9']+", reference.lower())
+    hyp = re.findall(r"[a-z0-9']+", hypothesis.lower())
+    if not ref:
+        return 0.0 if not hyp else 1.0
+    prev = list(range(len(hyp) + 1))
+    for i, r in enumerate(ref, 1):
+        cur = [i] + [0] * len(hyp)
+        for j, h in enumerate(hyp, 1):
+            cur[j] = min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + (r != h))
+        prev = cur
+    return prev[-1] / float(len(ref))
+
+
+def load_fixtures(directory):
+    fixtures = []
+    for name in sorted(os.listdir(directory)):
+        stem, ext = os.path.splitext(name)
+        if ext.lower() not in AUDIO_EXTENSIONS:
+            continue
+        with open(os.path.join(directory, name), "rb") as f:
+            raw = f.read()
+        wav = raw if ext.lower() in (".wav", ".wave") else file_bytes_to_wav_bytes(raw, input_ext=ext[1:])
+        reference = None
+        ref_path = os.path.join(directory, stem + ".txt")
+        if os.path.exists(ref_path):
+            with open(ref_path, encoding="utf-8") as f:
+                reference = f.read().strip()
+        fixtures.append((name, wav, reference))
+    return fixtures
+
+
+def synthetic_fixtures():
+    return [
+        (f"synthetic_{seconds}s_pad{pad}s.wav", synthetic_wav(seconds, silence_seconds=pad), None)
+        for seconds, pad in ((10, 2), (45, 3), (200, 5), (400, 4))
+    ]
+
+
+def _saved(before, after):
+    return 100.0 * (1 - after / float(before)) if before else 0.0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure audio_prep payload reduction.")
+    parser.add_argument("--fixtures", help="directory of answer recordings (+ optional .txt references)")
+    parser.add_argument("--format", default=None, help="override UNDERSTANDING_AUDIO_FORMAT (wav, flac, mp3)")
+    parser.add_argument("--transcribe", action="store_true", help="also compare transcripts / WER")
+    args = parser.parse_args(argv)
+
+    fixtures = load_fixtures(args.fixtures) if args.fixtures else synthetic_fixtures()
+    kwargs = {"audio_format": args.format} if args.format else {}
+
+    total_before = total_trimmed = total_after = 0
+    wer_before, wer_after = [], []
+    print(f"{'fixture':<32} {'before':>10} {'trimmed':>10} {'after':>10} "
+          f"{'trim':>7} {'encode':>7} {'total':>7} {'chunks':>6}  wer before/after")
+    for name, wav, reference in fixtures:
+        chunks, stats = prepare_for_understanding(wav, **kwargs)
+        wav_chunks, _ = prepare_for_understanding(wav, audio_format="wav")
+        # Two model calls per answer (transcript and delivery analysis), each over every chunk
+        before = 2 * request_bytes(wav)
+        trimmed = 2 * sum(request_bytes(c) for c, _ in wav_chunks)
+        after = 2 * sum(request_bytes(c) for c, _ in chunks)
+        total_before += before
+        total_trimmed += trimmed
+        total_after += after
+
+        wer_text = ""
+        if args.transcribe:
+            original = transcribe_wav_bytes(wav, file_format="wav", system_prompt=TRANSCRIBE_PROMPT).strip()
+            prepared = " ".join(
+                transcribe_wav_bytes(c, file_format=fmt, system_prompt=TRANSCRIBE_PROMPT).strip() for c, fmt in chunks
+            )
+            ref = reference if reference is not None else original
+            wb, wa = word_error_rate(ref, original), word_error_rate(ref, prepared)
+            wer_before.append(wb)
+            wer_after.append(wa)
+            wer_text = f"{wb:.3f}/{wa:.3f}"
+
+        if stats.get("capped"):
+            wer_text = f"(capped) {wer_text}"
+        print(f"{name[:32]:<32} {before:>10} {trimmed:>10} {after:>10} {_saved(before, trimmed):>6.1f}% "
+              f"{_saved(trimmed, after):>6.1f}% {_saved(before, after):>6.1f}% {stats.get('chunks', 1):>6}  {wer_text}")
+
+    if total_before:
+        print(f"{'TOTAL':<32} {total_before:>10} {total_trimmed:>10} {total_after:>10} "
+              f"{_saved(total_before, total_trimmed):>6.1f}% {_saved(total_trimmed, total_after):>6.1f}% "
+              f"{_saved(total_before, total_after):>6.1f}%")
+    if wer_before:
+        print(f"mean WER before {sum(wer_before) / len(wer_before):.3f}, after {sum(wer_after) / len(wer_after):.3f}"
+              " (reference = .txt when present, else the untrimmed transcript)")
+
+
+if __name__ == "__main__":
+    main()
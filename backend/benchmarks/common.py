@@ -0,0 +1,64 @@
+# benchmarks/common.py
+import io
+import math
+import struct
+import wave
+
+
+def percentile(values, pct):
+    """
+    Nearest-rank percentile; returns None for an empty list.
+    """
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100.0 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def summarize_latencies(latencies, wall_seconds, errors=0):
+    """
+    Build the standard report dict for a list of per-request latencies (seconds).
+    """
+    count = len(latencies)
+    return {
+        "requests": count + errors,
+        "errors": errors,
+        "p50_ms": _ms(percentile(latencies, 50)),
+        "p95_ms": _ms(percentile(latencies, 95)),
+        "p99_ms": _ms(percentile(latencies, 99)),
+        "mean_ms": _ms(sum(latencies) / count) if count else None,
+        "throughput_rps": round(count / wall_seconds, 3) if wall_seconds > 0 else None,
+    }
+
+
+def _ms(seconds):
+    return None if seconds is None else round(seconds * 1000.0, 2)
+
+
+def synthetic_pcm(seconds, sample_rate=16000, freq=220.0, amplitude=0.3, silence_seconds=0.0):
+    """
+    Generate mono s16le PCM: a tone of `seconds` padded with `silence_seconds`
+    of digital silence on each side (useful to exercise silence trimming).
+    """
+    pad = b"\x00\x00" * int(silence_seconds * sample_rate)
+    frames = int(seconds * sample_rate)
+    peak = int(32767 * amplitude)
+    tone = b"".join(
+        struct.pack("<h", int(peak * math.sin(2 * math.pi * freq * i / sample_rate))) for i in range(frames)
+    )
+    return pad + tone + pad
+
+
+def pcm_to_wav(pcm, sample_rate=16000, channels=1, sample_width=2):
+    buf = io.BytesIO()
+    with wave.open(buf, "wb") as wf:
+        wf.setnchannels(channels)
+        wf.setsampwidth(sample_width)
+        wf.setframerate(sample_rate)
+        wf.writeframes(pcm)
+    return buf.getvalue()
+
+
+def synthetic_wav(seconds, sample_rate=16000, silence_seconds=0.0):
+    return pcm_to_wav(synthetic_pcm(seconds, sample_rate, silence_seconds=silence_seconds), sample_rate)
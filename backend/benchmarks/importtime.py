@@ -0,0 +1,92 @@
+# benchmarks/importtime.py
+"""
+Summarize `python -X importtime -c "import app"` and fail if startup regresses.
+
+    python -m benchmarks.importtime --budget-ms 800 --top 15
+
+Exits non-zero when importing the app pulls in any of the deferred heavy
+packages (langchain, FAISS, openai, pypdf, numpy) or when the total import
+time exceeds the budget, so it can run as a CI guard.
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+# Packages that must only be imported on first use (see rag_question.py / app.py)
+DEFERRED_PACKAGES = (
+    "langchain",
+    "langchain_core",
+    "langchain_community",
+    "langchain_openai",
+    "langchain_text_splitters",
+    "faiss",
+    "openai",
+    "pypdf",
+    "numpy",
+)
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def measure(module="app"):
+    """
+    Run a fresh interpreter importing `module` and return a list of
+    (module_name, self_us, cumulative_us) rows in import order.
+    """
+    env = dict(os.environ, WARMUP_ON_START="0")
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=BACKEND_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"importing {module} failed:\n{proc.stderr[-2000:]}")
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line.split(":", 1)[1].split("|")
+        rows.append((name.rstrip(), int(self_us), int(cumulative_us)))
+    return rows
+
+
+def report(rows, module="app"):
+    """
+    Return (total_ms, rows sorted by cumulative time, deferred packages that were imported).
+    Nested imports keep their leading indentation in the raw rows; it is stripped here.
+    """
+    cleaned = [(name.strip(), self_us, cumulative_us) for name, self_us, cumulative_us in rows]
+    total_us = next((cum for name, _, cum in cleaned if name == module), sum(r[1] for r in cleaned))
+    leaked = sorted({name.split(".")[0] for name, _, _ in cleaned if name.split(".")[0] in DEFERRED_PACKAGES})
+    ranked = sorted(cleaned, key=lambda r: r[2], reverse=True)
+    return total_us / 1000.0, ranked, leaked
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Import-time report and startup guard for the backend.")
+    parser.add_argument("--module", default="app")
+    parser.add_argument("--budget-ms", type=float, default=800.0, help="fail if importing the module takes longer")
+    parser.add_argument("--top", type=int, default=15, help="number of slowest modules to list")
+    args = parser.parse_args(argv)
+
+    total_ms, ranked, leaked = report(measure(args.module), args.module)
+    print(f"import {args.module}: {total_ms:.1f} ms (budget {args.budget_ms:.0f} ms)")
+    print(f"{'cumulative ms':>14} {'self ms':>9}  module")
+    for name, self_us, cumulative_us in ranked[: args.top]:
+        print(f"{cumulative_us / 1000.0:>14.1f} {self_us / 1000.0:>9.1f}  {name}")
+
+    failed = False
+    if leaked:
+        print(f"FAIL: deferred packages imported at startup: {', '.join(leaked)}")
+        failed = True
+    if total_ms > args.budget_ms:
+        print(f"FAIL: import time {total_ms:.1f} ms exceeds budget {args.budget_ms:.0f} ms")
+        failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
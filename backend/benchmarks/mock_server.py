@@ -0,0 +1,366 @@
+# benchmarks/mock_server.py
+"""
+Local stand-in for the Boson / OpenAI endpoints used by the backend.
+
+    python -m benchmarks.mock_server --port 8001 --latency-ms 300 --error-rate 0.01
+
+Then start the backend against it:
+
+    BOSON_API_BASE=http://127.0.0.1:8001/v1 OPENAI_BASE_URL=http://127.0.0.1:8001/v1 \\
+    OPENAI_API_KEY=mock BOSON_API_KEY=mock python app.py
+"""
+import argparse
+import hashlib
+import json
+import math
+import random
+import struct
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+EMBEDDING_DIM = 64
+TTS_SAMPLE_RATE = 24000
+TTS_SECONDS_PER_CHAR = 0.06
+
+TRANSCRIPT_TEXT = (
+    "In my last project I led the migration of our billing service to an event driven design. "
+    "We cut p95 latency in half and I coordinated three teams to ship it on time."
+)
+AUDIO_ANALYSIS_TEXT = "Clear voice, moderate pace, little background noise, confident tone with steady pitch."
+ANALYSIS_JSON = {
+    "analysis_content": "Relevant example with a measurable outcome.",
+    "analysis_delivery": "Confident tone, moderate pace.",
+    "score": 7,
+}
+INTERVIEW_JSON = {
+    "strengths": ["Clear structure", "Quantified impact"],
+    "weaknesses": ["Could go deeper on trade-offs"],
+    "tips": ["Name the alternatives you rejected", "Keep answers under two minutes"],
+    "overall_score": 7,
+}
+QUESTIONS_JSON = [
+    {"question": "Describe a backend system you designed and the challenges faced."},
+    {"question": "How did you handle a disagreement with a teammate?"},
+    {"question": "How would you reduce tail latency in a read-heavy service?"},
+]
+FOLLOWUP_TEXT = "What would you do differently if you had to build it again?"
+COMMENT_TEXT = "Nice progress! Keep quantifying your impact and slow down slightly on long answers."
+
+
+class MockSettings:
+    def __init__(self, latency_ms=200.0, jitter_ms=50.0, error_rate=0.0, endpoint_latency_ms=None,
+                 stream_chunk_ms=20.0, think=True, seed=None):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.endpoint_latency_ms = endpoint_latency_ms or {}
+        self.stream_chunk_ms = stream_chunk_ms
+        self.think = think
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+
+    def delay(self, endpoint):
+        base = self.endpoint_latency_ms.get(endpoint, self.latency_ms)
+        with self.lock:
+            jitter = self.random.uniform(-self.jitter_ms, self.jitter_ms) if self.jitter_ms else 0.0
+        time.sleep(max(0.0, base + jitter) / 1000.0)
+
+    def should_fail(self):
+        if self.error_rate <= 0:
+            return False
+        with self.lock:
+            return self.random.random() < self.error_rate
+
+
+def _approx_tokens(text):
+    return max(1, len(text) // 4)
+
+
+def _flatten_content(messages):
+    """
+    Return (text, has_audio) for an OpenAI-style messages list.
+    """
+    parts = []
+    has_audio = False
+    for m in messages:
+        content = m.get("content")
+        if isinstance(content, str):
+            parts.append(content)
+        elif isinstance(content, list):
+            for item in content:
+                if item.get("type") == "input_audio":
+                    has_audio = True
+                elif item.get("type") == "text":
+                    parts.append(item.get("text", ""))
+    return "\n".join(parts), has_audio
+
+
+def chat_reply(messages, think=True):
+    """
+    Pick a canned reply shaped like what the real models return for each prompt family.
+    """
+    text, has_audio = _flatten_content(messages)
+    if has_audio:
+        return AUDIO_ANALYSIS_TEXT if "Analyze the audio" in text else TRANSCRIPT_TEXT
+
+    thinking = "<think>Considering the candidate's answer.</think>\n" if think else ""
+    if "friendly interview coach" in text:
+        return COMMENT_TEXT
+    if "interview questions" in text:
+        return json.dumps(QUESTIONS_JSON)
+    if "analysis_content" in text:
+        return thinking + json.dumps(ANALYSIS_JSON)
+    if "overall_score" in text:
+        return thinking + json.dumps(INTERVIEW_JSON)
+    if "follow-up" in text.lower():
+        return thinking + FOLLOWUP_TEXT
+    return thinking + json.dumps({"text": "ok"})
+
+
+def embed_text(value):
+    """
+    Deterministic unit vector for a string or a list of token ids.
+    """
+    if not isinstance(value, str):
+        value = json.dumps(value)
+    seed = hashlib.sha256(value.encode("utf-8")).digest()
+    rng = random.Random(seed)
+    vec = [rng.uniform(-1.0, 1.0) for _ in range(EMBEDDING_DIM)]
+    norm = math.sqrt(sum(v * v for v in vec)) or 1.0
+    return [v / norm for v in vec]
+
+
+def speech_pcm(text):
+    """
+    s16le mono PCM at 24 kHz with a duration proportional to the text length.
+    """
+    frames = int(max(0.5, len(text) * TTS_SECONDS_PER_CHAR) * TTS_SAMPLE_RATE)
+    peak = 6000
+    period = TTS_SAMPLE_RATE / 180.0
+    one_period = b"".join(
+        struct.pack("<h", int(peak * math.sin(2 * math.pi * i / period))) for i in range(int(period))
+    )
+    reps = frames // len(one_period) * 2 + 1
+    return (one_period * reps)[: frames * 2]
+
+
+def served_models():
+    """
+    Every model the backend is configured to use; the mock answers for any model,
+    so /models lists them all and the backend's route check passes.
+    """
+    import config
+    models = {config.AUDIO_UNDERSTANDING_MODEL, config.AUDIO_GENERATION_MODEL, config.QWEN_MODEL, config.QWEN_FAST_MODEL}
+    for route in config.MODEL_ROUTES.values():
+        models.update(m for m in (route["model"], route.get("fallback_model")) if m)
+    return models
+
+
+def make_handler(settings):
+    class MockHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, format, *args):
+            pass
+
+        def _send_json(self, status, payload):
+            body = json.dumps(payload).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _read_json(self):
+            length = int(self.headers.get("Content-Length") or 0)
+            raw = self.rfile.read(length) if length else b"{}"
+            try:
+                return json.loads(raw or b"{}")
+            except json.JSONDecodeError:
+                return {}
+
+        def _maybe_fail(self):
+            if settings.should_fail():
+                status = random.choice((429, 500, 503))
+                self._send_json(status, {"error": {"message": "injected failure", "type": "mock_error"}})
+                return True
+            return False
+
+        def do_GET(self):
+            if self.path.rstrip("/").endswith("/models"):
+                ids = ["mock"] + sorted(served_models())
+                self._send_json(200, {"object": "list", "data": [{"id": i, "object": "model"} for i in ids]})
+            else:
+                self._send_json(404, {"error": {"message": "not found"}})
+
+        def do_POST(self):
+            body = self._read_json()
+            path = self.path.split("?", 1)[0].rstrip("/")
+            if path.endswith("/chat/completions"):
+                self._chat(body)
+            elif path.endswith("/audio/speech"):
+                self._speech(body)
+            elif path.endswith("/embeddings"):
+                self._embeddings(body)
+            else:
+                self._send_json(404, {"error": {"message": f"unknown path {path}"}})
+
+        def _chat(self, body):
+            settings.delay("chat")
+            if self._maybe_fail():
+                return
+            messages = body.get("messages", [])
+            content = chat_reply(messages, think=settings.think)
+            prompt_text, _ = _flatten_content(messages)
+            usage = {
+                "prompt_tokens": _approx_tokens(prompt_text),
+                "completion_tokens": _approx_tokens(content),
+                "total_tokens": _approx_tokens(prompt_text) + _approx_tokens(content),
+            }
+            completion_id = f"chatcmpl-{uuid.uuid4().hex[:12]}"
+            model = body.get("model", "mock")
+            if body.get("stream"):
+                self._stream_chat(completion_id, model, content, usage)
+                return
+            self._send_json(200, {
+                "id": completion_id,
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": content},
+                    "finish_reason": "stop",
+                }],
+                "usage": usage,
+            })
+
+        def _stream_chat(self, completion_id, model, content, usage):
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Cache-Control", "no-cache")
+            self.send_header("Connection", "close")
+            self.end_headers()
+            words = content.split(" ")
+            for i, word in enumerate(words):
+                delta = {"content": word + (" " if i < len(words) - 1 else "")}
+                if i == 0:
+                    delta["role"] = "assistant"
+                chunk = {
+                    "id": completion_id,
+                    "object": "chat.completion.chunk",
+                    "created": int(time.time()),
+                    "model": model,
+                    "choices": [{"index": 0, "delta": delta, "finish_reason": None}],
+                }
+                self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+                self.wfile.flush()
+                time.sleep(settings.stream_chunk_ms / 1000.0)
+            final = {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}],
+                "usage": usage,
+            }
+            self.wfile.write(f"data: {json.dumps(final)}\n\ndata: [DONE]\n\n".encode("utf-8"))
+            self.wfile.flush()
+            self.close_connection = True
+
+        def _speech(self, body):
+            settings.delay("speech")
+            if self._maybe_fail():
+                return
+            pcm = speech_pcm(body.get("input", ""))
+            self.send_response(200)
+            self.send_header("Content-Type", "audio/pcm")
+            self.send_header("Content-Length", str(len(pcm)))
+            self.end_headers()
+            self.wfile.write(pcm)
+
+        def _embeddings(self, body):
+            settings.delay("embeddings")
+            if self._maybe_fail():
+                return
+            inputs = body.get("input", [])
+            if isinstance(inputs, str) or (inputs and isinstance(inputs[0], int)):
+                inputs = [inputs]
+            data = [{"object": "embedding", "index": i, "embedding": embed_text(v)} for i, v in enumerate(inputs)]
+            tokens = sum(_approx_tokens(v) if isinstance(v, str) else len(v) for v in inputs)
+            self._send_json(200, {
+                "object": "list",
+                "data": data,
+                "model": body.get("model", "mock-embedding"),
+                "usage": {"prompt_tokens": tokens, "total_tokens": tokens},
+            })
+
+    return MockHandler
+
+
+def serve(host="127.0.0.1", port=8001, settings=None):
+    """
+    Build (but do not start) a threaded mock server; call serve_forever() on the result.
+    """
+    settings = settings or MockSettings()
+    server = ThreadingHTTPServer((host, port), make_handler(settings))
+    server.daemon_threads = True
+    return server
+
+
+def start_in_thread(host="127.0.0.1", port=0, settings=None):
+    """
+    Start the mock server on a background thread; returns (server, base_url).
+    Port 0 picks a free port.
+    """
+    server = serve(host, port, settings)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server, f"http://{host}:{server.server_address[1]}/v1"
+
+
+def _parse_endpoint_latency(values):
+    result = {}
+    for item in values or []:
+        name, _, ms = item.partition("=")
+        result[name.strip()] = float(ms)
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Mock Boson/OpenAI server for offline benchmarks.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument("--latency-ms", type=float, default=200.0, help="base latency per call")
+    parser.add_argument("--jitter-ms", type=float, default=50.0, help="uniform +/- jitter")
+    parser.add_argument("--latency", action="append", metavar="ENDPOINT=MS",
+                        help="per-endpoint override: chat, speech or embeddings (repeatable)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of calls answered with 429/5xx")
+    parser.add_argument("--stream-chunk-ms", type=float, default=20.0, help="delay between streamed chunks")
+    parser.add_argument("--no-think", action="store_true", help="omit <think> blocks from chat replies")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    settings = MockSettings(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+        endpoint_latency_ms=_parse_endpoint_latency(args.latency),
+        stream_chunk_ms=args.stream_chunk_ms,
+        think=not args.no_think,
+        seed=args.seed,
+    )
+    server = serve(args.host, args.port, settings)
+    print(f"Mock Boson/OpenAI server on http://{args.host}:{server.server_address[1]}/v1")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+# benchmarks/run.py
+"""
+Drive the backend endpoints at a fixed concurrency and report latency percentiles.
+
+    python -m benchmarks.run --base-url http://127.0.0.1:5000 --scenario all --concurrency 8 --requests 64
+
+The backend should be pointed at a mock server (see benchmarks/mock_server.py) so
+results are reproducible and do not depend on hackathon.boson.ai.
+"""
+import argparse
+import json
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+import requests
+from benchmarks.common import summarize_latencies, synthetic_wav
+
+REQUEST_TIMEOUT = 120
+
+SAMPLE_QUESTION = "Describe a backend system you designed and the challenges faced."
+SAMPLE_RESPONSE = (
+    "I designed an event driven billing pipeline. The hardest part was idempotency "
+    "across retries, which we solved with request keys stored alongside each ledger entry."
+)
+
+
+def _question(session, base_url, payload):
+    data = {"role": "software engineer", "additional_note": "focus on distributed systems"}
+    files = None
+    if payload.get("resume"):
+        files = {"resume": ("resume.pdf", payload["resume"], "application/pdf")}
+    return session.post(f"{base_url}/question", data=data, files=files, timeout=REQUEST_TIMEOUT)
+
+
+def _tts(session, base_url, payload):
+    body = {"text": SAMPLE_QUESTION, "voice": "en_woman_1"}
+    if payload.get("format"):
+        body["format"] = payload["format"]
+    return session.post(f"{base_url}/tts", json=body, timeout=REQUEST_TIMEOUT)
+
+
+def _upload_answer(session, base_url, payload):
+    files = {"file": (payload["audio_name"], payload["audio"], payload["audio_mime"])}
+    return session.post(f"{base_url}/upload_answer", files=files, timeout=REQUEST_TIMEOUT)
+
+
+def _analyze_question(session, base_url, payload):
+    return session.post(f"{base_url}/analyze_question", json={"question": SAMPLE_QUESTION, "response": SAMPLE_RESPONSE}, timeout=REQUEST_TIMEOUT)
+
+
+def _summarize_interview(session, base_url, payload):
+    questions = [
+        {"question": SAMPLE_QUESTION, "response": SAMPLE_RESPONSE},
+        {"question": "How did you handle a disagreement with a teammate?", "response": "We wrote down both options and measured them."},
+        {"question": "How would you reduce tail latency?", "response": "Profile first, then cache hot reads and add hedged requests."},
+    ]
+    return session.post(f"{base_url}/summarize_interview", json={"questions": questions}, timeout=REQUEST_TIMEOUT)
+
+
+SCENARIOS = {
+    "question": _question,
+    "tts": _tts,
+    "upload_answer": _upload_answer,
+    "analyze_question": _analyze_question,
+    "summarize_interview": _summarize_interview,
+}
+
+
+def run_scenario(name, base_url, concurrency, total_requests, payload):
+    """
+    Fire `total_requests` calls of one scenario using `concurrency` worker threads.
+    Returns the summary dict from benchmarks.common.summarize_latencies plus response sizes.
+    """
+    call = SCENARIOS[name]
+    latencies = []
+    sizes = []
+    errors = 0
+
+    def one(_):
+        with requests.Session() as session:
+            t0 = time.perf_counter()
+            try:
+                resp = call(session, base_url, payload)
+                ok = resp.status_code < 400
+                size = len(resp.content)
+            except requests.RequestException:
+                ok, size = False, 0
+            return ok, time.perf_counter() - t0, size
+
+    wall_start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for ok, elapsed, size in pool.map(one, range(total_requests)):
+            if ok:
+                latencies.append(elapsed)
+                sizes.append(size)
+            else:
+                errors += 1
+    wall = time.perf_counter() - wall_start
+
+    report = summarize_latencies(latencies, wall, errors)
+    report["scenario"] = name
+    report["concurrency"] = concurrency
+    report["mean_response_bytes"] = round(sum(sizes) / len(sizes)) if sizes else None
+    return report
+
+
+def _format_row(report):
+    return (
+        f"{report['scenario']:<20} c={report['concurrency']:<3} n={report['requests']:<5} "
+        f"err={report['errors']:<4} p50={report['p50_ms']}ms p95={report['p95_ms']}ms "
+        f"p99={report['p99_ms']}ms rps={report['throughput_rps']}"
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the interview backend endpoints.")
+    parser.add_argument("--base-url", default="http://127.0.0.1:5000")
+    parser.add_argument("--scenario", action="append", choices=sorted(SCENARIOS) + ["all"],
+                        help="scenario to run (repeatable, default: all)")
+    parser.add_argument("--concurrency", type=int, action="append", help="worker threads (repeatable, default: 4)")
+    parser.add_argument("--requests", type=int, default=32, help="requests per scenario and concurrency level")
+    parser.add_argument("--audio", help="answer recording to upload (default: synthetic 20 s wav)")
+    parser.add_argument("--audio-seconds", type=float, default=20.0, help="length of the synthetic answer")
+    parser.add_argument("--resume", help="PDF resume to attach to /question")
+    parser.add_argument("--tts-format", help="format field sent to /tts (e.g. wav, mp3, opus)")
+    parser.add_argument("--json", dest="json_out", help="write the reports to this JSON file")
+    args = parser.parse_args(argv)
+
+    scenarios = args.scenario or ["all"]
+    if "all" in scenarios:
+        scenarios = list(SCENARIOS)
+    levels = args.concurrency or [4]
+
+    payload = {"format": args.tts_format}
+    if args.audio:
+        with open(args.audio, "rb") as f:
+            payload["audio"] = f.read()
+        payload["audio_name"] = args.audio.replace("\\", "/").split("/")[-1]
+        payload["audio_mime"] = "audio/webm" if args.audio.endswith(".webm") else "application/octet-stream"
+    else:
+        payload["audio"] = synthetic_wav(args.audio_seconds, silence_seconds=1.0)
+        payload["audio_name"] = "answer.wav"
+        payload["audio_mime"] = "audio/wav"
+    if args.resume:
+        with open(args.resume, "rb") as f:
+            payload["resume"] = f.read()
+
+    reports = []
+    for name in scenarios:
+        for level in levels:
+            report = run_scenario(name, args.base_url.rstrip("/"), level, args.requests, payload)
+            reports.append(report)
+            print(_format_row(report))
+            sys.stdout.flush()
+
+    if args.json_out:
+        with open(args.json_out, "w", encoding="utf-8") as f:
+            json.dump(reports, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
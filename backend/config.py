@@ -9,6 +9,98 @@ BOSON_API_KEY  = os.getenv("BOSON_API_KEY", "")
 AUDIO_UNDERSTANDING_MODEL = "higgs-audio-understanding-Hackathon"
 AUDIO_GENERATION_MODEL    = "higgs-audio-generation-Hackathon"
 QWEN_MODEL                = "Qwen3-Omni-30B-A3B-Thinking-Hackathon"
+# Non-thinking model for short structured outputs. It is checked against the
+# endpoint's model list at startup; routes fall back to QWEN_MODEL if it is missing.
+QWEN_FAST_MODEL           = os.getenv("QWEN_FAST_MODEL", "Qwen3-Omni-30B-A3B-Instruct-Hackathon")
+
+
+def _route(task, provider, model, max_tokens, temperature, slo_seconds, fallback_model):
+    # Every field can be overridden per task, e.g. ROUTE_ANALYZE_QUESTION_MODEL=...
+    prefix = f"ROUTE_{task.upper()}_"
+    return {
+        "provider": os.getenv(prefix + "PROVIDER", provider),
+        "model": os.getenv(prefix + "MODEL", model),
+        "max_tokens": int(os.getenv(prefix + "MAX_TOKENS", max_tokens)),
+        "temperature": float(os.getenv(prefix + "TEMPERATURE", temperature)),
+        "slo_seconds": float(os.getenv(prefix + "SLO_SECONDS", slo_seconds)),
+        "fallback_model": os.getenv(prefix + "FALLBACK_MODEL", fallback_model or "") or None,
+    }
+
+
+# Model routing per task: provider ("boson" or "openai"), model, token budget,
+# temperature, p95 latency SLO and the model to fall back to when it is breached.
+# The per-answer and per-interview tasks only return a few sentences of JSON, so
+# they use the non-thinking model with small budgets. Thinking models spend part
+# of max_tokens on reasoning, so routes that use them keep generous budgets.
+MODEL_ROUTES = {
+    "default":             _route("default", "boson", QWEN_MODEL, 4096, 0.0, 60, QWEN_FAST_MODEL),
+    "summary":             _route("summary", "boson", QWEN_FAST_MODEL, 600, 0.0, 10, None),
+    "analyze_question":    _route("analyze_question", "boson", QWEN_FAST_MODEL, 400, 0.0, 10, None),
+    "summarize_interview": _route("summarize_interview", "boson", QWEN_FAST_MODEL, 800, 0.0, 15, None),
+    "question_generation": _route("question_generation", "openai", "gpt-4o-mini", 800, 0.0, 15, None),
+    "comment":             _route("comment", "openai", "gpt-4o-mini", 60, 0.7, 5, None),
+    # Speculative follow-ups must be ready before the answer ends, so they use the non-thinking model
+    "followup":            _route("followup", "boson", QWEN_FAST_MODEL, 200, 0.0, 5, None),
+}
+# Calls kept per task/model to estimate p95 latency, and how often (seconds) a
+# degraded task still sends one call to its primary model to notice recovery
+ROUTE_LATENCY_WINDOW = int(os.getenv("ROUTE_LATENCY_WINDOW", "50"))
+ROUTE_PROBE_SECONDS  = float(os.getenv("ROUTE_PROBE_SECONDS", "30"))
+# Routes whose model is missing from the endpoint use QWEN_MODEL with at least this budget
+THINKING_MIN_TOKENS  = int(os.getenv("THINKING_MIN_TOKENS", "3072"))
+# Retry the model-list check this often while it fails; each attempt gives up
+# after the timeout (no client retries) since routed calls wait for it
+ROUTE_VERIFY_RETRY_SECONDS   = float(os.getenv("ROUTE_VERIFY_RETRY_SECONDS", "300"))
+ROUTE_VERIFY_TIMEOUT_SECONDS = float(os.getenv("ROUTE_VERIFY_TIMEOUT_SECONDS", "5"))
 
 # TTS voice (one of the supported voices from docs)
 DEFAULT_VOICE = os.getenv("HIGGS_TTS_VOICE", "en_woman_1")
+
+# Tracing: when set, every request writes a JSON trace of its spans into this directory
+TRACE_DIR = os.getenv("TRACE_DIR", "")
+
+# Record/replay of model calls: "off", "record" or "replay" (see recording.py)
+MODEL_RECORD_MODE   = os.getenv("MODEL_RECORD_MODE", "off").lower()
+MODEL_ARCHIVE_PATH  = os.getenv("MODEL_ARCHIVE_PATH", "./model_calls.sqlite")
+MODEL_REPLAY_TIMING = os.getenv("MODEL_REPLAY_TIMING", "fast").lower()  # "original" or "fast"
+
+# Import langchain/openai and build clients in the background once the server is up
+WARMUP_ON_START = os.getenv("WARMUP_ON_START", "1") not in ("0", "false", "False", "")
+
+# Shared cache tier (TTS audio, resume indexes, LLM responses), read by all workers
+CACHE_DIR = os.getenv("CACHE_DIR", "./cache")
+TTS_CACHE_TTL = int(os.getenv("TTS_CACHE_TTL", str(7 * 24 * 3600)))
+LLM_CACHE_TTL = int(os.getenv("LLM_CACHE_TTL", str(24 * 3600)))
+RESUME_INDEX_TTL = int(os.getenv("RESUME_INDEX_TTL", str(7 * 24 * 3600)))
+# Expired rows are purged and least-recently-used rows evicted above the size cap every N writes
+CACHE_MAX_BYTES   = int(os.getenv("CACHE_MAX_BYTES", str(1024 * 1024 * 1024)))
+CACHE_PURGE_EVERY = int(os.getenv("CACHE_PURGE_EVERY", "100"))
+# Keep /metrics series and model-router latency windows in the shared cache so
+# every worker reports and routes on the same numbers (gunicorn.conf.py turns it on)
+SHARED_WORKER_STATE     = os.getenv("SHARED_WORKER_STATE", "0") not in ("0", "false", "False", "")
+METRICS_PUBLISH_SECONDS = float(os.getenv("METRICS_PUBLISH_SECONDS", "1"))
+METRICS_SNAPSHOT_TTL    = int(os.getenv("METRICS_SNAPSHOT_TTL", str(24 * 3600)))
+
+# HTTP responses: gzip/zstd compression, ETags, and long-lived caching of fingerprinted static assets
+HTTP_COMPRESSION          = os.getenv("HTTP_COMPRESSION", "1") not in ("0", "false", "False", "")
+HTTP_COMPRESS_MIN_BYTES   = int(os.getenv("HTTP_COMPRESS_MIN_BYTES", "512"))
+STATIC_IMMUTABLE_MAX_AGE  = int(os.getenv("STATIC_IMMUTABLE_MAX_AGE", str(365 * 24 * 3600)))
+
+# Adaptive mode: follow-up questions generated (and synthesized) from partial answers
+FOLLOWUP_MIN_WORDS  = int(os.getenv("FOLLOWUP_MIN_WORDS", "12"))
+FOLLOWUP_WORKERS    = int(os.getenv("FOLLOWUP_WORKERS", "2"))
+FOLLOWUP_TTL        = int(os.getenv("FOLLOWUP_TTL", "900"))
+# Only the end of each partial is transcribed (the page also uploads just the tail)
+FOLLOWUP_TAIL_SECONDS = float(os.getenv("FOLLOWUP_TAIL_SECONDS", "30"))
+
+# Sessions are kept in memory unless a database path is given (required for multiple workers)
+SESSION_DB_PATH = os.getenv("SESSION_DB_PATH", "")
+# Largest page /session_history returns
+SESSION_PAGE_MAX = int(os.getenv("SESSION_PAGE_MAX", "50"))
+
+# Audio sent to the understanding model: trimmed, split into chunks and optionally
+# re-encoded. MAX_ANSWER_SECONDS only caps answers when chunking is off (0).
+UNDERSTANDING_AUDIO_FORMAT  = os.getenv("UNDERSTANDING_AUDIO_FORMAT", "wav")  # "wav", "flac" or "mp3"
+SILENCE_THRESHOLD_DBFS      = float(os.getenv("SILENCE_THRESHOLD_DBFS", "-45"))
+MAX_ANSWER_SECONDS          = float(os.getenv("MAX_ANSWER_SECONDS", "300"))
+UNDERSTANDING_CHUNK_SECONDS = float(os.getenv("UNDERSTANDING_CHUNK_SECONDS", "120"))
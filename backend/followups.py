@@ -0,0 +1,178 @@
+# followups.py
+"""
+Speculative follow-up questions for adaptive mode.
+
+While the candidate is still answering, the practice page uploads the audio
+recorded so far to /partial_answer every few seconds. Each upload starts a
+background job that transcribes it, asks the "followup" route for one
+follow-up question, and synthesizes that question through the normal TTS
+cache. When the candidate stops speaking the follow-up and its audio are
+usually ready already.
+
+Only the last FOLLOWUP_TAIL_SECONDS of each partial are transcribed, so the
+work per upload stays constant however long the answer runs.
+
+Job state is kept per answer "slot" in the shared cache, so any worker can
+serve /followup. Every upload carries an increasing `seq`. A newer partial
+supersedes older jobs: queued ones exit as soon as they start, and running
+ones stop at their next checkpoint instead of writing results. The last finished follow-up stays available while a newer
+job is still running. Follow-ups that are not asked are simply discarded.
+"""
+import json
+import re
+import threading
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from config import FOLLOWUP_MIN_WORDS, FOLLOWUP_WORKERS, FOLLOWUP_TTL, FOLLOWUP_TAIL_SECONDS
+from audio_prep import prepare_for_understanding, tail_wav
+from higgs_client import file_bytes_to_wav_bytes, transcribe_wav_bytes
+from llm_client import suggest_followup_llm
+from shared_cache import get_cache
+from tracing import span, FOLLOWUP_OUTCOMES
+
+NAMESPACE = "followup"
+
+_executor = None
+_executor_lock = threading.Lock()
+_newest = {}   # slot -> newest seq submitted in this process
+
+
+def _get_executor():
+    # Created on first use so forked gunicorn workers each get their own threads
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=FOLLOWUP_WORKERS, thread_name_prefix="followup")
+    return _executor
+
+
+def get_followup(slot):
+    """
+    Current state for an answer slot: {"status", "seq", "followup"} where status is
+    "pending", "ready", "skipped" or "error" and followup is the latest finished
+    {"question", "seq"} (possibly from an older partial). Returns None if unknown.
+    """
+    return get_cache().get_json(NAMESPACE, slot)
+
+
+def discard_followup(slot, used=False):
+    """
+    Drop a slot's state. Running jobs notice and stop at their next checkpoint.
+    """
+    cache = get_cache()
+    with cache.flight_lock(NAMESPACE, slot):
+        state = cache.get_json(NAMESPACE, slot)
+        cache.delete(NAMESPACE, slot)
+    _newest.pop(slot, None)
+    if state and state.get("followup"):
+        FOLLOWUP_OUTCOMES.inc(outcome="used" if used else "discarded")
+    return state
+
+
+def submit_partial(slot, seq, audio_bytes, ext, question, role="", synthesize=None):
+    """
+    Start a speculative follow-up job for the answer recorded so far.
+    Returns False (and does nothing) if a partial with the same or a newer seq
+    was already accepted for this slot.
+    """
+    cache = get_cache()
+    with cache.flight_lock(NAMESPACE, slot):
+        state = cache.get_json(NAMESPACE, slot) or {}
+        if state.get("seq", -1) >= seq:
+            FOLLOWUP_OUTCOMES.inc(outcome="stale")
+            return False
+        cache.set_json(
+            NAMESPACE, slot, {"seq": seq, "status": "pending", "followup": state.get("followup")}, ttl=FOLLOWUP_TTL
+        )
+        _newest[slot] = seq
+    _get_executor().submit(_run_job, slot, seq, audio_bytes, ext, question, role, synthesize)
+    return True
+
+
+def _is_current(slot, seq):
+    if _newest.get(slot, seq) != seq:
+        return False
+    state = get_followup(slot)
+    return state is not None and state.get("seq") == seq
+
+
+def _finish(slot, seq, **fields):
+    """
+    Write a job's result unless it has been superseded or discarded meanwhile.
+    """
+    cache = get_cache()
+    with cache.flight_lock(NAMESPACE, slot):
+        state = cache.get_json(NAMESPACE, slot)
+        if state is None or state.get("seq") != seq:
+            FOLLOWUP_OUTCOMES.inc(outcome="superseded")
+            return False
+        state.update(fields)
+        cache.set_json(NAMESPACE, slot, state, ttl=FOLLOWUP_TTL)
+    FOLLOWUP_OUTCOMES.inc(outcome=fields.get("status", "ready"))
+    return True
+
+
+def parse_followup(result):
+    """
+    Follow-up question text from a call_llm result (parsed JSON or {"text": ...}).
+    """
+    if isinstance(result, dict) and result.get("followup"):
+        return str(result["followup"]).strip()
+    text = result.get("text", "") if isinstance(result, dict) else str(result)
+    # Thinking models put their reasoning before the JSON
+    text = re.sub(r".*</think>", "", text, flags=re.DOTALL).strip()
+    text = re.sub(r"```(?:json)?", "", text).strip()
+    try:
+        return str(json.loads(text).get("followup", "")).strip()
+    except (ValueError, AttributeError):
+        match = re.search(r'"followup"\s*:\s*"([^"]+)"', text)
+        if match:
+            return match.group(1).strip()
+    lines = [line.strip() for line in text.splitlines() if line.strip()]
+    return lines[0] if lines else ""
+
+
+def _run_job(slot, seq, audio_bytes, ext, question, role, synthesize):
+    try:
+        # Jobs queued behind a newer partial for the same slot do no work at all
+        if not _is_current(slot, seq):
+            FOLLOWUP_OUTCOMES.inc(outcome="superseded")
+            return
+        with span("followup.transcribe", seq=seq, input_bytes=len(audio_bytes)):
+            wav_bytes = audio_bytes if ext in ("wav", "wave") else file_bytes_to_wav_bytes(audio_bytes, input_ext=ext)
+            chunks, _ = prepare_for_understanding(tail_wav(wav_bytes, FOLLOWUP_TAIL_SECONDS))
+            transcript = " ".join(
+                transcribe_wav_bytes(
+                    chunk, file_format=chunk_format, system_prompt="Please transcribe this audio exactly as spoken."
+                ).strip()
+                for chunk, chunk_format in chunks
+            ).strip()
+        if not _is_current(slot, seq):
+            FOLLOWUP_OUTCOMES.inc(outcome="superseded")
+            return
+        if len(transcript.split()) < FOLLOWUP_MIN_WORDS:
+            # Too little said to ask about yet; keep any earlier follow-up
+            _finish(slot, seq, status="skipped")
+            return
+
+        with span("followup.generate", seq=seq):
+            followup = parse_followup(suggest_followup_llm(question, transcript, role))
+        if not followup:
+            _finish(slot, seq, status="error", error="empty follow-up")
+            return
+        if not _is_current(slot, seq):
+            FOLLOWUP_OUTCOMES.inc(outcome="superseded")
+            return
+
+        if synthesize is not None:
+            try:
+                with span("followup.tts", seq=seq):
+                    synthesize(followup)  # fills the TTS cache read by /tts
+            except Exception:
+                # /tts will synthesize on demand instead
+                traceback.print_exc()
+        _finish(slot, seq, status="ready", followup={"question": followup, "seq": seq})
+    except Exception as e:
+        traceback.print_exc()
+        _finish(slot, seq, status="error", error=str(e))
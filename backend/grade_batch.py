@@ -0,0 +1,339 @@
+# grade_batch.py
+"""
+Re-score batches of recorded interviews offline, without clicking through the UI.
+
+    python grade_batch.py answers/manifest.jsonl --out results.jsonl
+    python grade_batch.py answers/manifest.csv --out results.jsonl --parquet results.parquet --workers 8 --concurrency 16
+    python grade_batch.py answers/manifest.jsonl --out results.jsonl --mock
+
+The manifest has one row per answer, as JSONL or CSV, with these fields:
+`interview_id`, `question` and `audio`. The audio path is relative to the
+manifest. `question_index` is optional.
+
+Each answer goes through the same steps as the practice page: decode
+(ffmpeg), silence trim, transcription, then analyze_question_llm. Once all
+answers of an interview are graded, the interview is summarized with
+summarize_interview_llm.
+
+Decoding runs in a process pool. Model calls run on threads, bounded by
+--concurrency. Every result is appended to --out as soon as it is ready,
+so the same file works as a checkpoint. Rerunning the command skips answers
+and interviews already graded and retries failures.
+
+--mock starts benchmarks/mock_server in-process and points the model clients
+at it, for an end-to-end run without network access.
+"""
+import argparse
+import asyncio
+import csv
+import json
+import multiprocessing
+import os
+import sys
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from benchmarks.common import percentile
+
+TRANSCRIBE_PROMPT = "Please transcribe this audio exactly as spoken."
+PROGRESS_EVERY = 25
+
+
+# -------------------- Manifest and checkpoint -------------------- #
+def load_manifest(path):
+    """
+    Rows from a JSONL or CSV manifest, with `audio` resolved against the
+    manifest's directory and `question_index` filled in by order of appearance.
+    """
+    base = os.path.dirname(os.path.abspath(path))
+    if path.lower().endswith(".csv"):
+        with open(path, newline="", encoding="utf-8") as f:
+            raw_rows = list(csv.DictReader(f))
+    else:
+        with open(path, encoding="utf-8") as f:
+            raw_rows = [json.loads(line) for line in f if line.strip()]
+
+    rows = []
+    next_index = defaultdict(int)
+    for line_no, row in enumerate(raw_rows, 1):
+        missing = [k for k in ("interview_id", "question", "audio") if not row.get(k)]
+        if missing:
+            raise ValueError(f"{path}: row {line_no} is missing {', '.join(missing)}")
+        interview_id = str(row["interview_id"])
+        index = row.get("question_index")
+        index = int(index) if index not in (None, "") else next_index[interview_id]
+        next_index[interview_id] = max(next_index[interview_id], index + 1)
+        rows.append({
+            "interview_id": interview_id,
+            "question_index": index,
+            "question": row["question"],
+            "audio": os.path.join(base, row["audio"]),
+        })
+    return rows
+
+
+def answer_id(row):
+    return f"{row['interview_id']}/{row['question_index']}"
+
+
+def load_checkpoint(path):
+    """
+    (graded answers by id, ids of summarized interviews) from an earlier run's output.
+    A torn last line from an interrupted run is ignored.
+    """
+    answers, interviews = {}, set()
+    if not os.path.exists(path):
+        return answers, interviews
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            if record.get("status") != "ok":
+                continue
+            if record.get("type") == "answer":
+                answers[answer_id(record)] = record
+            elif record.get("type") == "interview":
+                interviews.add(record["interview_id"])
+    return answers, interviews
+
+
+# -------------------- Decoding (process pool) -------------------- #
+def decode_answer(path):
+    """
+    Decode and trim one recording. Runs in a worker process, so it returns
+    plain data: {"chunks": [(bytes, format)], "seconds", "speech_seconds"}.
+    """
+    from audio_prep import prepare_for_understanding
+    from higgs_client import file_bytes_to_wav_bytes
+
+    with open(path, "rb") as f:
+        content = f.read()
+    ext = os.path.splitext(path)[1].lstrip(".").lower() or "webm"
+    wav_bytes = content if ext in ("wav", "wave") else file_bytes_to_wav_bytes(content, input_ext=ext)
+    chunks, stats = prepare_for_understanding(wav_bytes)
+    return {
+        "chunks": chunks,
+        "seconds": stats.get("original_seconds"),
+        "speech_seconds": stats.get("speech_seconds"),
+    }
+
+
+# -------------------- Grading -------------------- #
+class BatchGrader:
+    def __init__(self, out, pool, concurrency, done_answers, done_interviews):
+        self.out = out
+        self.pool = pool
+        self.model_slots = asyncio.Semaphore(concurrency)
+        # Bounds decoded audio held in memory while it waits for a model slot
+        self.answer_slots = asyncio.Semaphore(max(2, concurrency * 2))
+        self.done_answers = done_answers
+        self.done_interviews = done_interviews
+        self.latencies = defaultdict(list)
+        self.counts = defaultdict(int)
+        self.audio_seconds = 0.0
+        self.started = time.perf_counter()
+
+    def write(self, record):
+        self.out.write(json.dumps(record) + "\n")
+        self.out.flush()
+
+    async def model_call(self, kind, fn, *args, **kwargs):
+        async with self.model_slots:
+            t0 = time.perf_counter()
+            try:
+                return await asyncio.to_thread(fn, *args, **kwargs)
+            finally:
+                self.latencies[kind].append(time.perf_counter() - t0)
+
+    async def grade_answer(self, row):
+        from higgs_client import transcribe_wav_bytes
+        from llm_client import analyze_question_llm, parse_question_analysis
+
+        record = {"type": "answer", **{k: row[k] for k in ("interview_id", "question_index", "question")}}
+        async with self.answer_slots:
+            try:
+                t0 = time.perf_counter()
+                decoded = await asyncio.get_running_loop().run_in_executor(self.pool, decode_answer, row["audio"])
+                self.latencies["decode"].append(time.perf_counter() - t0)
+
+                parts = await asyncio.gather(*(
+                    self.model_call("transcribe", transcribe_wav_bytes, chunk,
+                                    file_format=chunk_format, system_prompt=TRANSCRIBE_PROMPT)
+                    for chunk, chunk_format in decoded["chunks"]
+                ))
+                transcript = " ".join(p.strip() for p in parts).strip()
+                analysis = parse_question_analysis(
+                    await self.model_call("analyze", analyze_question_llm, row["question"], transcript)
+                )
+                record.update(
+                    status="ok",
+                    transcript=transcript,
+                    audio_seconds=decoded["seconds"],
+                    speech_seconds=decoded["speech_seconds"],
+                    **analysis,
+                )
+                self.audio_seconds += decoded["seconds"] or 0.0
+            except Exception as e:
+                record.update(status="error", error=f"{type(e).__name__}: {e}")
+        self.counts[record["status"]] += 1
+        self.write(record)
+        self.report_progress()
+        return record
+
+    async def grade_interview(self, interview_id, rows):
+        from llm_client import summarize_interview_llm, parse_interview_summary
+
+        pending = [r for r in rows if answer_id(r) not in self.done_answers]
+        graded = {answer_id(r): self.done_answers[answer_id(r)] for r in rows if answer_id(r) in self.done_answers}
+        for record in await asyncio.gather(*(self.grade_answer(r) for r in pending)):
+            graded[answer_id(record)] = record
+
+        if interview_id in self.done_interviews:
+            return
+        answers = sorted(graded.values(), key=lambda r: r["question_index"])
+        if any(a["status"] != "ok" for a in answers):
+            return  # summarized on a later run, once every answer is graded
+        record = {"type": "interview", "interview_id": interview_id, "answers": len(answers)}
+        try:
+            questions = [{"question": a["question"], "response": a["transcript"]} for a in answers]
+            summary = parse_interview_summary(
+                await self.model_call("summarize", summarize_interview_llm, questions)
+            )
+            scores = [a["score"] for a in answers if a.get("score") is not None]
+            record.update(status="ok", total_score=sum(scores), overall_summary=summary)
+        except Exception as e:
+            record.update(status="error", error=f"{type(e).__name__}: {e}")
+        self.counts[f"interview_{record['status']}"] += 1
+        self.write(record)
+
+    def report_progress(self, final=False):
+        done = self.counts["ok"] + self.counts["error"]
+        if not final and (done == 0 or done % PROGRESS_EVERY):
+            return
+        wall = time.perf_counter() - self.started
+        print(
+            f"[grade_batch] {done} answers ({self.counts['error']} errors) in {wall:.1f}s: "
+            f"{done / wall if wall else 0:.2f} answers/s, "
+            f"{self.audio_seconds / wall if wall else 0:.1f} audio s/s",
+            file=sys.stderr,
+        )
+
+    def summary(self):
+        wall = time.perf_counter() - self.started
+        answers = self.counts["ok"] + self.counts["error"]
+        report = {
+            "answers_graded": self.counts["ok"],
+            "answer_errors": self.counts["error"],
+            "interviews_summarized": self.counts["interview_ok"],
+            "interview_errors": self.counts["interview_error"],
+            "wall_seconds": round(wall, 3),
+            "answers_per_second": round(answers / wall, 3) if wall else None,
+            "audio_seconds": round(self.audio_seconds, 1),
+            "audio_seconds_per_second": round(self.audio_seconds / wall, 2) if wall else None,
+        }
+        for kind, values in sorted(self.latencies.items()):
+            report[f"{kind}_p50_ms"] = round(percentile(values, 50) * 1000.0, 1)
+            report[f"{kind}_p95_ms"] = round(percentile(values, 95) * 1000.0, 1)
+        return report
+
+
+async def grade_all(rows, out, workers, concurrency, done_answers, done_interviews):
+    by_interview = defaultdict(list)
+    for row in rows:
+        by_interview[row["interview_id"]].append(row)
+    # asyncio.to_thread uses the default executor; size it to the model concurrency
+    asyncio.get_running_loop().set_default_executor(ThreadPoolExecutor(max_workers=concurrency))
+    # spawn: the event loop and client threads are not safe to fork
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+        grader = BatchGrader(out, pool, concurrency, done_answers, done_interviews)
+        await asyncio.gather(*(grader.grade_interview(i, r) for i, r in by_interview.items()))
+    grader.report_progress(final=True)
+    return grader.summary()
+
+
+# -------------------- Output -------------------- #
+def write_parquet(jsonl_path, parquet_path):
+    """
+    Convert the JSONL results into two Parquet files: <name>.parquet with one
+    row per answer and <name>.interviews.parquet with one row per interview.
+    Only the latest successful record of each answer/interview is kept.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    answers, interviews = {}, {}
+    with open(jsonl_path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            if record.get("status") != "ok":
+                continue
+            if record["type"] == "answer":
+                answers[answer_id(record)] = record
+            else:
+                interviews[record["interview_id"]] = dict(
+                    record, overall_summary=json.dumps(record.get("overall_summary"))
+                )
+    pq.write_table(pa.Table.from_pylist(list(answers.values())), parquet_path)
+    stem, ext = os.path.splitext(parquet_path)
+    pq.write_table(pa.Table.from_pylist(list(interviews.values())), f"{stem}.interviews{ext or '.parquet'}")
+
+
+def start_mock():
+    """
+    Serve benchmarks/mock_server on a free port and point the model clients at it.
+    Must run before llm_client/higgs_client are imported (config reads the env once).
+    Mock results also go to their own CACHE_DIR unless one is set explicitly.
+    """
+    from benchmarks.mock_server import start_in_thread
+
+    _, base_url = start_in_thread()
+    os.environ.update(
+        BOSON_API_BASE=base_url, OPENAI_BASE_URL=base_url, BOSON_API_KEY="mock", OPENAI_API_KEY="mock"
+    )
+    os.environ.setdefault("CACHE_DIR", "./cache-mock")
+    return base_url
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Grade recorded interview answers in bulk.")
+    parser.add_argument("manifest", help="JSONL or CSV with interview_id, question, audio[, question_index]")
+    parser.add_argument("--out", required=True, help="results JSONL (also the resume checkpoint)")
+    parser.add_argument("--parquet", help="also write results as Parquet (requires pyarrow)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 2, help="decode processes")
+    parser.add_argument("--concurrency", type=int, default=8, help="model calls in flight")
+    parser.add_argument("--mock", action="store_true", help="run against an in-process mock model server")
+    args = parser.parse_args(argv)
+
+    if args.parquet:
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            parser.error("--parquet needs pyarrow: pip install pyarrow (or drop --parquet and use the JSONL)")
+    if args.mock:
+        print(f"[grade_batch] using mock model server at {start_mock()}", file=sys.stderr)
+
+    rows = load_manifest(args.manifest)
+    done_answers, done_interviews = load_checkpoint(args.out)
+    skipped = sum(1 for r in rows if answer_id(r) in done_answers)
+    if skipped:
+        print(f"[grade_batch] resuming: {skipped}/{len(rows)} answers already graded", file=sys.stderr)
+
+    with open(args.out, "a", encoding="utf-8") as out:
+        report = asyncio.run(
+            grade_all(rows, out, max(1, args.workers), max(1, args.concurrency), done_answers, done_interviews)
+        )
+    report["answers_resumed"] = skipped
+    if args.parquet:
+        write_parquet(args.out, args.parquet)
+        report["parquet"] = args.parquet
+    print(json.dumps(report, indent=2))
+    return 0 if report["answer_errors"] == 0 and report["interview_errors"] == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
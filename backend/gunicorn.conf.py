@@ -0,0 +1,45 @@
+# gunicorn.conf.py
+"""
+Multi-worker deployment:
+
+    cd backend
+    gunicorn -c gunicorn.conf.py app:app
+
+Each worker is a separate process; sessions go to SQLite (SESSION_DB_PATH) and
+TTS audio, resume indexes and LLM responses to the shared cache (CACHE_DIR), so
+all workers see the same data and generate each item only once.
+
+With SHARED_WORKER_STATE each worker also publishes its /metrics series and
+model-router latency windows to the shared cache. /metrics on any worker then
+reports the sum over all workers, and SLO fallbacks use latencies from all of them.
+"""
+import multiprocessing
+import os
+
+# Must be set before the app module is imported by the workers
+os.environ.setdefault("SESSION_DB_PATH", "./data/sessions.sqlite")
+os.environ.setdefault("CACHE_DIR", "./cache")
+os.environ.setdefault("SHARED_WORKER_STATE", "1")
+
+bind = os.getenv("BIND", "0.0.0.0:5000")
+workers = int(os.getenv("WEB_CONCURRENCY", multiprocessing.cpu_count()))
+# Requests mostly wait on model APIs, so each worker also serves a few threads
+worker_class = "gthread"
+threads = int(os.getenv("WORKER_THREADS", "4"))
+# Model calls and ffmpeg can take well over gunicorn's 30 s default
+timeout = int(os.getenv("WORKER_TIMEOUT", "180"))
+graceful_timeout = 30
+keepalive = 5
+
+# Imports are cheap (see app.py), so workers load the app themselves after the fork
+# instead of sharing pre-fork state such as sqlite connections.
+preload_app = False
+
+
+def post_worker_init(worker):
+    # The master has already bound the port; warm heavy imports in the background
+    from config import WARMUP_ON_START
+    if WARMUP_ON_START:
+        import threading
+        from app import warm_up
+        threading.Thread(target=warm_up, name="warmup", daemon=True).start()
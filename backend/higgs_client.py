@@ -5,15 +5,25 @@ import os
 import subprocess
 import uuid
 import wave
-from openai import OpenAI
+from functools import lru_cache
 from config import BOSON_API_KEY, BOSON_API_BASE, AUDIO_UNDERSTANDING_MODEL, AUDIO_GENERATION_MODEL, DEFAULT_VOICE
+from tracing import span, record_usage
+from recording import recorded
 
-# Initialize OpenAI-compatible client pointing at Boson
-client = OpenAI(api_key=BOSON_API_KEY, base_url=BOSON_API_BASE)
+
+@lru_cache(maxsize=None)
+def get_client():
+    """
+    OpenAI-compatible client pointing at Boson, built on first use so that
+    importing this module stays cheap (openai pulls in httpx and pydantic).
+    """
+    from openai import OpenAI
+    return OpenAI(api_key=BOSON_API_KEY, base_url=BOSON_API_BASE)
 
 
 def encode_bytes_to_base64(b: bytes) -> str:
-    return base64.b64encode(b).decode("utf-8")
+    with span("base64_encode", bytes=len(b)):
+        return base64.b64encode(b).decode("utf-8")
 
 
 def file_bytes_to_wav_bytes(input_bytes: bytes, input_ext: str = "webm"):
@@ -21,6 +31,7 @@ def file_bytes_to_wav_bytes(input_bytes: bytes, input_ext: str = "webm"):
     Convert an input audio blob (webm/ogg/mp3) to WAV bytes using ffmpeg.
     Requires ffmpeg installed. Returns wav bytes.
     """
+    os.makedirs("./tmp", exist_ok=True)
     tmp_in = f"./tmp/{uuid.uuid4().hex}_in.{input_ext}"
     tmp_out = f"./tmp/{uuid.uuid4().hex}_out.wav"
     with open(tmp_in, "wb") as f:
@@ -28,7 +39,8 @@ def file_bytes_to_wav_bytes(input_bytes: bytes, input_ext: str = "webm"):
 
     # ffmpeg -y -i input -ar 16000 -ac 1 output.wav
     cmd = ["ffmpeg", "-y", "-i", tmp_in, "-ar", "16000", "-ac", "1", tmp_out]
-    subprocess.run(cmd, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    with span("ffmpeg_convert", input_ext=input_ext, input_bytes=len(input_bytes)):
+        subprocess.run(cmd, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
 
     with open(tmp_out, "rb") as f:
         wav_bytes = f.read()
@@ -43,6 +55,52 @@ def file_bytes_to_wav_bytes(input_bytes: bytes, input_ext: str = "webm"):
     return wav_bytes
 
 
+# Compressed output formats: name -> (mimetype, file extension, ffmpeg encoder args)
+AUDIO_FORMATS = {
+    "opus": ("audio/webm", "webm", ["-c:a", "libopus", "-b:a", "24k", "-application", "voip", "-f", "webm"]),
+    "mp3": ("audio/mpeg", "mp3", ["-c:a", "libmp3lame", "-b:a", "48k", "-f", "mp3"]),
+    "flac": ("audio/flac", "flac", ["-c:a", "flac", "-f", "flac"]),
+}
+
+
+@lru_cache(maxsize=None)
+def encoder_available(audio_format: str) -> bool:
+    """
+    Whether ffmpeg is installed with the encoder for `audio_format`.
+    Checked once per process, so callers can skip formats that would only fail.
+    """
+    if audio_format == "wav":
+        return True
+    if audio_format not in AUDIO_FORMATS:
+        return False
+    codec = AUDIO_FORMATS[audio_format][2][1]
+    try:
+        proc = subprocess.run(
+            ["ffmpeg", "-hide_banner", "-encoders"], check=True, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return False
+    return any(line.split()[1:2] == [codec] for line in proc.stdout.decode("utf-8", "replace").splitlines())
+
+
+def encode_wav_bytes(wav_bytes: bytes, audio_format: str) -> bytes:
+    """
+    Re-encode WAV bytes into one of AUDIO_FORMATS with ffmpeg, via pipes.
+    Requires ffmpeg installed. "wav" returns the input unchanged.
+    """
+    if audio_format == "wav":
+        return wav_bytes
+    if audio_format not in AUDIO_FORMATS:
+        raise ValueError(f"unsupported audio format: {audio_format}")
+    cmd = ["ffmpeg", "-hide_banner", "-loglevel", "error", "-f", "wav", "-i", "pipe:0"]
+    cmd += AUDIO_FORMATS[audio_format][2] + ["pipe:1"]
+    with span("ffmpeg_encode", format=audio_format, input_bytes=len(wav_bytes)) as attrs:
+        proc = subprocess.run(cmd, input=wav_bytes, check=True, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+        attrs["output_bytes"] = len(proc.stdout)
+    return proc.stdout
+
+
+@recorded("transcribe")
 def transcribe_wav_bytes(wav_bytes: bytes, file_format="wav", system_prompt: str = None):
     """
     Use Boson's higgs-audio-understanding model via chat.completions.
@@ -55,24 +113,27 @@ def transcribe_wav_bytes(wav_bytes: bytes, file_format="wav", system_prompt: str
     if system_prompt is None:
         system_prompt = "You are an expert audio transcriber and evaluator."
 
-    response = client.chat.completions.create(
-        model=AUDIO_UNDERSTANDING_MODEL,
-        messages=[
-            {"role": "system", "content": system_prompt},
-            {
-                "role": "user",
-                "content": [
-                    {"type": "input_audio", "input_audio": {"data": audio_base64, "format": file_format}}
-                ],
-            }
-        ],
-        max_completion_tokens=4096,
-        temperature=0.0,
-    )
+    with span("model_call.audio_understanding", audio_bytes=len(wav_bytes)) as attrs:
+        response = get_client().chat.completions.create(
+            model=AUDIO_UNDERSTANDING_MODEL,
+            messages=[
+                {"role": "system", "content": system_prompt},
+                {
+                    "role": "user",
+                    "content": [
+                        {"type": "input_audio", "input_audio": {"data": audio_base64, "format": file_format}}
+                    ],
+                }
+            ],
+            max_completion_tokens=4096,
+            temperature=0.0,
+        )
+        record_usage(attrs, AUDIO_UNDERSTANDING_MODEL, getattr(response, "usage", None))
 
     return response.choices[0].message.content.strip()
 
 
+@recorded("tts")
 def tts_text_to_wav_bytes(text: str, voice: str = DEFAULT_VOICE):
     """
     Use Boson's audio.speech.create (audio/speech) to generate PCM, then wrap into WAV bytes.
@@ -80,13 +141,16 @@ def tts_text_to_wav_bytes(text: str, voice: str = DEFAULT_VOICE):
     The model returns PCM in response.content; we must write WAV header.
     """
     # Request PCM from service
-    resp = client.audio.speech.create(
-        model=AUDIO_GENERATION_MODEL,
-        voice=voice,
-        input=text,
-        response_format="pcm"
-    )
-    pcm_data = resp.content  # bytes of PCM (s16le)
+    with span("model_call.tts", chars=len(text)) as attrs:
+        resp = get_client().audio.speech.create(
+            model=AUDIO_GENERATION_MODEL,
+            voice=voice,
+            input=text,
+            response_format="pcm"
+        )
+        pcm_data = resp.content  # bytes of PCM (s16le)
+        attrs["model"] = AUDIO_GENERATION_MODEL
+        attrs["pcm_bytes"] = len(pcm_data)
     # Wrap PCM into WAV (mono, 16-bit, 24000 Hz per docs)
     num_channels = 1
     sample_width = 2
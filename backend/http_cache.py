@@ -0,0 +1,194 @@
+# http_cache.py
+"""
+Response compression, ETags and browser caching for the API and the frontend.
+
+- JSON/HTML/CSS/JS bodies are compressed with zstd or gzip, whichever the
+  client's Accept-Encoding prefers (zstd only when zstandard is installed).
+- GET responses get a strong ETag per representation, and a matching
+  If-None-Match returns 304 with no body, so history polling and page reloads
+  cost a hash instead of a download.
+- Local asset references in the HTML pages are rewritten to `?v=<hash>`.
+  Requests carrying the current hash are cached as immutable for a year. HTML
+  and API responses use `no-cache`, which means "revalidate with the ETag".
+
+Audio responses are left alone: they are already compressed or are large WAVs
+served with send_file.
+"""
+import gzip
+import hashlib
+import os
+import re
+import threading
+from collections import OrderedDict
+from flask import request
+from config import HTTP_COMPRESSION, HTTP_COMPRESS_MIN_BYTES, STATIC_IMMUTABLE_MAX_AGE
+from tracing import span
+
+try:
+    import zstandard
+except ImportError:  # gzip alone is still a large win for JSON/HTML
+    zstandard = None
+
+COMPRESSIBLE_MIMETYPES = (
+    "application/json",
+    "application/javascript",
+    "text/javascript",
+    "text/html",
+    "text/css",
+    "text/plain",
+    "image/svg+xml",
+)
+# Bodies above this are passed through untouched rather than buffered
+MAX_BUFFERED_BYTES = 8 * 1024 * 1024
+STATIC_ENDPOINTS = ("static", "index")
+ASSET_REF = re.compile(r'''((?:href|src)=["'])([^"'?#:]+\.(?:css|js|png|jpe?g|gif|svg|webp|ico))(["'])''')
+
+_fingerprints = {}   # static path -> (mtime_ns, size, digest)
+_compressed = OrderedDict()   # representation ETag -> encoded bytes, for static assets only
+_compressed_lock = threading.Lock()
+MAX_COMPRESSED_ENTRIES = 128
+
+
+def asset_fingerprint(static_folder, relpath):
+    """
+    Short content hash of a file under the static folder (None if it is missing).
+    Recomputed only when the file's mtime or size changes.
+    """
+    path = os.path.join(static_folder, relpath.lstrip("/"))
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    cached = _fingerprints.get(path)
+    if cached and cached[:2] == (st.st_mtime_ns, st.st_size):
+        return cached[2]
+    with open(path, "rb") as f:
+        digest = hashlib.sha256(f.read()).hexdigest()[:12]
+    _fingerprints[path] = (st.st_mtime_ns, st.st_size, digest)
+    return digest
+
+
+def fingerprint_html(html, static_folder):
+    """
+    Append `?v=<hash>` to local css/js/image references in an HTML page.
+    """
+    def repl(match):
+        prefix, ref, quote = match.groups()
+        if ref.startswith("//"):
+            return match.group(0)
+        digest = asset_fingerprint(static_folder, ref)
+        return f"{prefix}{ref}?v={digest}{quote}" if digest else match.group(0)
+
+    return ASSET_REF.sub(repl, html)
+
+
+def negotiate_encoding():
+    if not HTTP_COMPRESSION:
+        return None
+    offered = ["zstd", "gzip"] if zstandard is not None else ["gzip"]
+    return request.accept_encodings.best_match(offered)
+
+
+def compress(data, encoding):
+    if encoding == "zstd":
+        # Compressor objects are not thread-safe; they are cheap to create
+        return zstandard.ZstdCompressor(level=3).compress(data)
+    return gzip.compress(data, compresslevel=6, mtime=0)
+
+
+def _compress_static(etag, data, encoding):
+    with _compressed_lock:
+        body = _compressed.get(etag)
+        if body is not None:
+            _compressed.move_to_end(etag)
+            return body
+    body = compress(data, encoding)
+    with _compressed_lock:
+        _compressed[etag] = body
+        while len(_compressed) > MAX_COMPRESSED_ENTRIES:
+            _compressed.popitem(last=False)
+    return body
+
+
+def _cache_control(response, is_static, static_folder):
+    if not is_static:
+        response.headers.setdefault("Cache-Control", "no-cache")
+        return
+    version = request.args.get("v")
+    if version and version == asset_fingerprint(static_folder, request.path):
+        response.headers["Cache-Control"] = f"public, max-age={STATIC_IMMUTABLE_MAX_AGE}, immutable"
+    else:
+        response.headers["Cache-Control"] = "no-cache"
+
+
+def _not_modified(response):
+    response.status_code = 304
+    response.set_data(b"")
+    for header in ("Content-Length", "Content-Encoding", "Content-Type"):
+        response.headers.pop(header, None)
+    return response
+
+
+def process_response(response, static_folder):
+    """
+    after_request hook: fingerprint HTML, compress, set ETag/Cache-Control, answer 304s.
+    """
+    mimetype = response.mimetype or ""
+    if mimetype.startswith("audio/") or response.status_code != 200:
+        return response
+    is_static = request.endpoint in STATIC_ENDPOINTS
+    if request.method in ("GET", "HEAD"):
+        _cache_control(response, is_static, static_folder)
+
+    if mimetype not in COMPRESSIBLE_MIMETYPES or "Content-Encoding" in response.headers:
+        return response
+    if response.direct_passthrough:
+        # send_static_file hands back a file wrapper; only buffer our own assets
+        if not is_static or (response.content_length or 0) > MAX_BUFFERED_BYTES:
+            return response
+        response.direct_passthrough = False
+    elif response.is_streamed:
+        return response
+
+    data = response.get_data()
+    if is_static and mimetype == "text/html":
+        data = fingerprint_html(data.decode("utf-8"), static_folder).encode("utf-8")
+        # The page now depends on its assets' hashes, not just its own mtime
+        response.headers.pop("Last-Modified", None)
+    if len(data) > MAX_BUFFERED_BYTES:
+        response.set_data(data)
+        return response
+
+    encoding = negotiate_encoding() if len(data) >= HTTP_COMPRESS_MIN_BYTES else None
+    response.vary.add("Accept-Encoding")
+    etag = hashlib.sha256(data).hexdigest()[:32]
+    if encoding:
+        etag = f"{etag}-{encoding}"
+
+    if request.method in ("GET", "HEAD"):
+        response.set_etag(etag)
+        if request.if_none_match.contains_weak(etag):
+            return _not_modified(response)
+
+    if encoding:
+        with span("http.compress", encoding=encoding, raw_bytes=len(data)) as attrs:
+            body = _compress_static(etag, data, encoding) if is_static else compress(data, encoding)
+            attrs["encoded_bytes"] = len(body)
+        response.set_data(body)
+        response.headers["Content-Encoding"] = encoding
+    else:
+        response.set_data(data)
+    return response
+
+
+def init_http_cache(app):
+    """
+    Register the compression/caching hook on a Flask app.
+    """
+    static_folder = app.static_folder
+
+    @app.after_request
+    def _http_cache(response):
+        return process_response(response, static_folder)
+
+    return app
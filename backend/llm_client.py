@@ -1,10 +1,27 @@
 # llm_client.py
 import json
-from openai import OpenAI
-from config import BOSON_API_KEY, BOSON_API_BASE, QWEN_MODEL
-from model_prompts import build_interview_prompt, build_question_prompt, build_summary_prompt, DELIMITER
+import re
+import time
+from functools import lru_cache
+from config import BOSON_API_KEY, BOSON_API_BASE, QWEN_MODEL, LLM_CACHE_TTL
+from model_prompts import (
+    build_followup_prompt,
+    build_interview_prompt,
+    build_question_prompt,
+    build_summary_prompt,
+    DELIMITER,
+)
+from tracing import span, record_usage
+from recording import recorded
+from shared_cache import get_cache, make_key
+from model_router import choose_route, observe
 
-client = OpenAI(api_key=BOSON_API_KEY, base_url=BOSON_API_BASE)
+
+@lru_cache(maxsize=None)
+def get_client():
+    # Built lazily: importing openai is one of the slowest parts of startup
+    from openai import OpenAI
+    return OpenAI(api_key=BOSON_API_KEY, base_url=BOSON_API_BASE)
 
 
 # No longer used
@@ -89,7 +106,7 @@ Format:
 
     full_prompt = f"{persona_pattern}\n{cot_pattern}\n{format_template_pattern}\n{few_shot_pattern}\n{user_prompt}"
 
-    resp = client.chat.completions.create(
+    resp = get_client().chat.completions.create(
         model=QWEN_MODEL,
         messages=[
             {"role": "system", "content": "You are a professional interviewer and question generator."},
@@ -127,34 +144,170 @@ Format:
 #     )
 #     return resp.choices[0].message.content.strip()
 
-def call_llm(prompt: str, temperature=0.0):
-    resp = client.chat.completions.create(
-        model=QWEN_MODEL,
-        messages=[
-            {"role": "system", "content": "You are an expert interview coach."},
-            {"role": "user", "content": prompt}
-        ],
-        temperature=temperature,
-        max_tokens=4096
-    )
-    content = resp.choices[0].message.content.strip()
+@lru_cache(maxsize=None)
+def get_openai_client():
+    # OpenAI proper (OPENAI_API_KEY / OPENAI_BASE_URL), for routes with provider "openai"
+    from openai import OpenAI
+    return OpenAI()
+
+
+def complete(task: str, messages: list, temperature=None, route=None) -> str:
+    """
+    Run one chat completion for `task` using the model, token budget and
+    temperature from its route (see config.MODEL_ROUTES / model_router).
+    """
+    route = route or choose_route(task)
+    model = route["model"]
+    client = get_openai_client() if route["provider"] == "openai" else get_client()
+    usage = None
+    t0 = time.perf_counter()
     try:
-        return json.loads(content)
-    except Exception:
-        # fallback: return raw text if JSON fails
-        return {"text": content}
+        with span(f"model_call.{task}", model=model, degraded=route["degraded"]) as attrs:
+            resp = client.chat.completions.create(
+                model=model,
+                messages=messages,
+                temperature=route["temperature"] if temperature is None else temperature,
+                max_tokens=route["max_tokens"]
+            )
+            usage = getattr(resp, "usage", None)
+            record_usage(attrs, model, usage)
+    finally:
+        # Failed and timed-out calls count towards the SLO as well
+        observe(task, model, time.perf_counter() - t0, usage, route)
+    return resp.choices[0].message.content.strip()
+
+
+@recorded("call_llm")
+def call_llm(prompt: str, temperature=None, task="default"):
+    route = choose_route(task)
+    messages = [
+        {"role": "system", "content": "You are an expert interview coach."},
+        {"role": "user", "content": prompt}
+    ]
+    effective_temperature = route["temperature"] if temperature is None else temperature
+    if effective_temperature == 0:
+        # Deterministic prompts are shared by all workers and generated only once
+        content = get_cache().get_or_create_json(
+            "llm",
+            make_key(route["model"], route["max_tokens"], prompt),
+            lambda: complete(task, messages, effective_temperature, route),
+            ttl=LLM_CACHE_TTL,
+        )
+    else:
+        content = complete(task, messages, effective_temperature, route)
+    with span("parse.llm_json"):
+        try:
+            return json.loads(content)
+        except Exception:
+            # fallback: return raw text if JSON fails
+            return {"text": content}
+
+
+ANALYSIS_KEYS = ("analysis_content", "analysis_delivery", "score")
+
+
+def llm_result_text(result):
+    """
+    call_llm returns {"text": ...} when the model wrapped its JSON in reasoning
+    (thinking models) and the parsed dict when it replied with bare JSON
+    (non-thinking models). Parsers read dicts directly and use this only to
+    get at the text of the first case.
+    """
+    if isinstance(result, dict) and set(result) == {"text"}:
+        return result["text"]
+    return result if isinstance(result, str) else json.dumps(result, ensure_ascii=False)
+
+
+def _as_score(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _question_analysis_from_dict(result):
+    return {
+        "analysis_content": str(result.get("analysis_content") or ""),
+        "analysis_delivery": str(result.get("analysis_delivery") or ""),
+        "score": _as_score(result.get("score")),
+    }
+
+
+def parse_question_analysis(result):
+    """
+    {analysis_content, analysis_delivery, score} from an analyze_question_llm result.
+    """
+    if isinstance(result, dict) and any(key in result for key in ANALYSIS_KEYS):
+        return _question_analysis_from_dict(result)
+    raw_analysis = llm_result_text(result)
+
+    # Step 1: Remove everything before </think>
+    if "</think>" in raw_analysis:
+        raw_analysis = raw_analysis.split("</think>", 1)[1]
+    try:
+        parsed = json.loads(re.sub(r"```(?:json)?", "", raw_analysis).strip())
+    except ValueError:
+        parsed = None
+    if isinstance(parsed, dict):
+        return _question_analysis_from_dict(parsed)
+
+    # Step 2: Extract analysis_content
+    match_content = re.search(r'"analysis_content"\s*:\s*"(.*?)"\s*,\s*"analysis_delivery"', raw_analysis, re.DOTALL)
+    analysis_content = match_content.group(1) if match_content else ""
+
+    # Step 3: Extract analysis_delivery
+    match_delivery = re.search(r'"analysis_delivery"\s*:\s*"(.*?)"\s*,\s*"score"', raw_analysis, re.DOTALL)
+    analysis_delivery = match_delivery.group(1) if match_delivery else ""
+
+    # Step 4: Extract score (integer)
+    match_score = re.search(r'"score"\s*:\s*(\d+)', raw_analysis)
+    score = int(match_score.group(1)) if match_score else None
+
+    return {
+        "analysis_content": analysis_content,
+        "analysis_delivery": analysis_delivery,
+        "score": score
+    }
+
+
+def parse_interview_summary(result):
+    """
+    Overall summary dict from a summarize_interview_llm result, with list
+    fields joined into HTML lines for the frontend.
+    """
+    if isinstance(result, dict) and set(result) != {"text"}:
+        summary = dict(result)
+    else:
+        # Keep only content after </think>
+        result = llm_result_text(result)
+        if "</think>" in result:
+            result = result.split("</think>", 1)[1].strip()
+
+        # Try parsing as JSON (in case it's a JSON string)
+        try:
+            summary = json.loads(result)
+        except json.JSONDecodeError:
+            summary = {"text": result}  # fallback as plain text
+        if not isinstance(summary, dict):
+            summary = {"text": result}
+
+    # Convert lists to HTML strings
+    for key in ["strengths", "weaknesses", "tips"]:
+        if key in summary and isinstance(summary[key], list):
+            summary[key] = "<br>".join(summary[key])
+    return summary
 
 
 def summarize_transcript_llm(transcript: str):
     user_input = f"{DELIMITER} Candidate Transcript:\n{transcript}\n{DELIMITER}\nReturn STRICTLY as ONLY JSON output as in few-shot example."
     prompt = build_summary_prompt(user_input)
-    return call_llm(prompt)
+    return call_llm(prompt, task="summary")
 
 
 def analyze_question_llm(question: str, response: str):
     user_input = f"{DELIMITER} Question: {question}\nResponse: {response}\n{DELIMITER}\nReturn STRICTLY as ONLY JSON output as in few-shot example."
     prompt = build_question_prompt(user_input, response)
-    return call_llm(prompt)
+    return call_llm(prompt, task="analyze_question")
 
 
 def summarize_interview_llm(questions: list):
@@ -164,5 +317,9 @@ def summarize_interview_llm(questions: list):
 
     user_input = f"{DELIMITER} Candidate Responses:\n{transcript}\n{DELIMITER}\nReturn STRICTLY as ONLY JSON output as in few-shot example."
     prompt = build_interview_prompt(user_input)
-    return call_llm(prompt)
+    return call_llm(prompt, task="summarize_interview")
+
 
+def suggest_followup_llm(question: str, partial_answer: str, role: str = ""):
+    prompt = build_followup_prompt(question, partial_answer, role)
+    return call_llm(prompt, task="followup")
@@ -113,3 +113,33 @@ def build_interview_prompt(user_input):
     user_input = f"{DELIMITER} Candidate Responses:\n{user_input}\n{DELIMITER}\nReturn STRICTLY as JSON output as in example."
     return f"{PERSONA_INTERVIEW}\n{COT_INTERVIEW}\n{FEWSHOT_INTERVIEW}\n{user_input}"
 
+
+# -------------------- Follow-up Question -------------------- #
+PERSONA_FOLLOWUP = f"""
+# Persona
+You are a professional interviewer running a realistic mock interview.
+While the candidate is still answering, you prepare ONE natural follow-up question that digs deeper into what they have said so far.
+The query is delimited by {DELIMITER}.
+"""
+
+COT_FOLLOWUP = f"""
+# Chain of Thought
+Step 1: {DELIMITER} Read the interview question and the (possibly unfinished) answer.
+Step 2: {DELIMITER} Pick the most interesting claim, decision or gap in the answer.
+Step 3: {DELIMITER} Ask one short follow-up (under 25 words) about it. Do not repeat the original question.
+"""
+
+FEWSHOT_FOLLOWUP = """
+# Few-Shot Example
+Question: "Describe a challenge you overcame."
+Answer so far: "In my last project we had to migrate the billing service with a tight deadline, so I split the work into..."
+Output:
+{
+  "followup": "How did you decide which parts of the billing migration to ship first?"
+}
+"""
+
+def build_followup_prompt(question: str, partial_answer: str, role: str = ""):
+    role_line = f"Role: {role}\n" if role else ""
+    user_input = f"{DELIMITER} {role_line}Question: {question}\nAnswer so far: {partial_answer}\n{DELIMITER}\nReturn STRICTLY as JSON output as in example."
+    return f"{PERSONA_FOLLOWUP}\n{COT_FOLLOWUP}\n{FEWSHOT_FOLLOWUP}\n{user_input}"
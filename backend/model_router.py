@@ -0,0 +1,233 @@
+# model_router.py
+"""
+Per-task model selection from config.MODEL_ROUTES.
+
+Each task has a primary model, token budget, temperature and a p95 latency
+SLO. When the primary's recent p95 exceeds the SLO the task is routed to its
+fallback (a non-thinking model). Every ROUTE_PROBE_SECONDS one call still goes
+to the primary as a probe; a probe that meets the SLO clears the primary's
+latency window, so the task recovers on the next call instead of waiting for
+the slow samples to age out. Latency and token usage are exported per
+task through tracing (/metrics).
+
+Boson routes are checked against the endpoint's model list once (see
+verify_models()); a route whose model is not served moves to QWEN_MODEL with
+a thinking-sized budget, and fallbacks that are not served are dropped.
+
+Latency windows live in this process, or in the shared cache when
+SHARED_WORKER_STATE is on, so all gunicorn workers fall back and recover together.
+"""
+import threading
+import time
+from collections import deque
+from config import (
+    MODEL_ROUTES, ROUTE_LATENCY_WINDOW, ROUTE_PROBE_SECONDS, SHARED_WORKER_STATE,
+    QWEN_MODEL, THINKING_MIN_TOKENS, ROUTE_VERIFY_RETRY_SECONDS, ROUTE_VERIFY_TIMEOUT_SECONDS,
+    MODEL_RECORD_MODE,
+)
+from tracing import TASK_DURATION, TASK_TOKENS, TASK_FALLBACKS
+
+_lock = threading.Lock()
+_last_probe = {}  # task -> monotonic time of the last probe of its primary
+_routes = None    # MODEL_ROUTES after verify_models() adjusted them
+_verify_lock = threading.Lock()
+_verify_failed_at = None
+# Windows outlive a quiet period but not a deployment's worth of stale samples
+SHARED_WINDOW_TTL = 3600
+
+
+class LocalWindows:
+    """
+    Recent latencies per (task, model), in this process only.
+    """
+
+    def __init__(self):
+        self._windows = {}
+
+    def append(self, task, model, seconds):
+        with _lock:
+            window = self._windows.get((task, model))
+            if window is None:
+                window = self._windows[(task, model)] = deque(maxlen=ROUTE_LATENCY_WINDOW)
+            window.append(seconds)
+
+    def values(self, task, model):
+        with _lock:
+            return list(self._windows.get((task, model), ()))
+
+    def clear(self, task, model):
+        with _lock:
+            self._windows.pop((task, model), None)
+
+
+class SharedWindows:
+    """
+    Recent latencies per (task, model), kept in the shared cache for all workers.
+    """
+    NAMESPACE = "route_latency"
+
+    @staticmethod
+    def _key(task, model):
+        return f"{task}|{model}"
+
+    def append(self, task, model, seconds):
+        from shared_cache import get_cache
+        # Called from inside cached LLM producers, so no flight lock here
+        get_cache().update_json(
+            self.NAMESPACE,
+            self._key(task, model),
+            lambda window: ((window or []) + [seconds])[-ROUTE_LATENCY_WINDOW:],
+            ttl=SHARED_WINDOW_TTL,
+        )
+
+    def values(self, task, model):
+        from shared_cache import get_cache
+        return get_cache().get_json(self.NAMESPACE, self._key(task, model)) or []
+
+    def clear(self, task, model):
+        from shared_cache import get_cache
+        get_cache().delete(self.NAMESPACE, self._key(task, model))
+
+
+_windows = SharedWindows() if SHARED_WORKER_STATE else LocalWindows()
+
+
+def get_route(task):
+    """
+    Static route for `task` (unknown tasks use the "default" route).
+    """
+    routes = _routes if _routes is not None else _verified_routes()
+    return routes.get(task) or routes["default"]
+
+
+def list_served_models():
+    import llm_client
+    # Short and without retries: the first routed call on a worker waits for this
+    client = llm_client.get_client().with_options(timeout=ROUTE_VERIFY_TIMEOUT_SECONDS, max_retries=0)
+    return {model.id for model in client.models.list()}
+
+
+def resolve_routes(routes, served):
+    """
+    Copy of `routes` with every Boson model that is not in `served` replaced:
+    primaries by QWEN_MODEL (with at least THINKING_MIN_TOKENS), fallbacks by None.
+    """
+    resolved = {}
+    for task, route in routes.items():
+        route = dict(route)
+        if route["provider"] == "boson":
+            if route["model"] not in served:
+                route["model"] = QWEN_MODEL
+                route["max_tokens"] = max(route["max_tokens"], THINKING_MIN_TOKENS)
+            if route.get("fallback_model") not in served or route.get("fallback_model") == route["model"]:
+                route["fallback_model"] = None
+        resolved[task] = route
+    return resolved
+
+
+# Used while the model list cannot be fetched: only QWEN_MODEL is assumed to exist
+_UNVERIFIED_ROUTES = resolve_routes(MODEL_ROUTES, {QWEN_MODEL})
+
+
+def verify_models():
+    """
+    Check the configured Boson models against the endpoint's model list and
+    fix up the routes. Until the check succeeds, models other than QWEN_MODEL
+    are treated as unavailable; a failed check is retried after
+    ROUTE_VERIFY_RETRY_SECONDS. Replay runs trust the configuration.
+    """
+    global _routes, _verify_failed_at
+    with _verify_lock:
+        if _routes is not None:
+            return _routes
+        if MODEL_RECORD_MODE == "replay":
+            _routes = MODEL_ROUTES
+            return _routes
+        try:
+            served = list_served_models()
+        except Exception as e:
+            print(f"[model_router] model list unavailable ({e!r}); using {QWEN_MODEL} for Boson routes for now")
+            _verify_failed_at = time.monotonic()
+            return _UNVERIFIED_ROUTES
+        _routes = resolve_routes(MODEL_ROUTES, served)
+        for task, route in _routes.items():
+            if route["model"] != MODEL_ROUTES[task]["model"]:
+                print(f"[model_router] {MODEL_ROUTES[task]['model']} is not served; routing {task} to {route['model']}")
+        return _routes
+
+
+def _verified_routes():
+    if _verify_failed_at is not None and time.monotonic() - _verify_failed_at < ROUTE_VERIFY_RETRY_SECONDS:
+        return _UNVERIFIED_ROUTES
+    return verify_models()
+
+
+def p95_latency(task, model):
+    window = _windows.values(task, model)
+    if len(window) < 5:
+        return None
+    window.sort()
+    return window[int(0.95 * (len(window) - 1))]
+
+
+def choose_route(task):
+    """
+    Route to use for the next call of `task`: a copy of the configured route,
+    with `model` swapped for the fallback while the primary breaches its SLO.
+    `probe` is True when the call goes to a degraded primary to test recovery.
+    """
+    route = dict(get_route(task), task=task, degraded=False, probe=False)
+    fallback = route.get("fallback_model")
+    if not fallback:
+        return route
+    p95 = p95_latency(task, route["model"])
+    if p95 is None or p95 <= route["slo_seconds"]:
+        return route
+    now = time.monotonic()
+    with _lock:
+        if now - _last_probe.get(task, 0.0) >= ROUTE_PROBE_SECONDS:
+            _last_probe[task] = now
+            route["probe"] = True
+            return route
+    TASK_FALLBACKS.inc(task=task, model=fallback)
+    route["model"] = fallback
+    route["degraded"] = True
+    return route
+
+
+def observe(task, model, seconds, usage=None, route=None):
+    """
+    Record one call's latency (and OpenAI-style usage, if any) for routing and /metrics.
+    Pass the route from choose_route() so a successful probe can reset the window.
+    """
+    if route is not None and route.get("probe") and seconds <= route["slo_seconds"]:
+        # The primary has recovered; forget the slow samples that degraded it
+        _windows.clear(task, model)
+    _windows.append(task, model, seconds)
+    TASK_DURATION.observe(seconds, task=task, model=model)
+    if usage is None:
+        return
+    for kind in ("prompt_tokens", "completion_tokens"):
+        value = getattr(usage, kind, None)
+        if value:
+            TASK_TOKENS.inc(value, task=task, model=model, kind=kind.replace("_tokens", ""))
+    details = getattr(usage, "completion_tokens_details", None)
+    reasoning = getattr(details, "reasoning_tokens", None) if details is not None else None
+    if reasoning:
+        TASK_TOKENS.inc(reasoning, task=task, model=model, kind="reasoning")
+
+
+def route_stats():
+    """
+    Snapshot of current routing state, for debugging.
+    """
+    stats = {}
+    for task in MODEL_ROUTES:
+        route = get_route(task)
+        stats[task] = {
+            "model": route["model"],
+            "fallback_model": route.get("fallback_model"),
+            "slo_seconds": route["slo_seconds"],
+            "p95_seconds": p95_latency(task, route["model"]),
+        }
+    return stats
@@ -1,27 +1,93 @@
 # rag_question.py
-from langchain_core.runnables import RunnablePassthrough
-from langchain_core.output_parsers import StrOutputParser
-from langchain_core.prompts import ChatPromptTemplate
-from langchain_openai import ChatOpenAI
-from langchain_community.embeddings import OpenAIEmbeddings
-from langchain_openai import OpenAIEmbeddings
-from langchain_community.vectorstores import FAISS
+# langchain, FAISS and the OpenAI clients are imported inside the methods that
+# need them so that importing this module (and app.py) stays fast.
 import re
 import json
+import time
+from functools import lru_cache
+from types import SimpleNamespace
+from tracing import span, MODEL_TOKENS
+from recording import recorded
+from config import BOSON_API_BASE, BOSON_API_KEY
+from model_router import choose_route, observe
+
+
+@lru_cache(maxsize=None)
+def get_chat_model(provider, model, temperature, max_tokens):
+    """
+    One ChatOpenAI per routed (provider, model, temperature, max_tokens), reused
+    across requests. "boson" routes go to the Boson endpoint, anything else to OpenAI.
+    """
+    from langchain_openai import ChatOpenAI
+    if provider == "boson":
+        return ChatOpenAI(
+            model=model, temperature=temperature, max_tokens=max_tokens, base_url=BOSON_API_BASE, api_key=BOSON_API_KEY
+        )
+    return ChatOpenAI(model=model, temperature=temperature, max_tokens=max_tokens)
+
+@lru_cache(maxsize=None)
+def _openai_embeddings():
+    from langchain_openai import OpenAIEmbeddings
+    return OpenAIEmbeddings()
+
+
+@recorded("embed_documents")
+def embed_documents(texts):
+    return _openai_embeddings().embed_documents(list(texts))
+
+
+@recorded("embed_query")
+def embed_query(text):
+    return _openai_embeddings().embed_query(text)
+
+
+@lru_cache(maxsize=None)
+def get_embeddings():
+    """
+    LangChain embeddings backed by embed_documents/embed_query, so resume
+    indexes and retriever queries are recorded and replayed like other model calls.
+    """
+    from langchain_core.embeddings import Embeddings
+
+    class RecordedEmbeddings(Embeddings):
+        def embed_documents(self, texts):
+            return embed_documents(list(texts))
+
+        def embed_query(self, text):
+            return embed_query(text)
+
+    return RecordedEmbeddings()
+
+
+@recorded("chat_openai", ignore=("chain",))
+def invoke_question_chain(chain, model, prompt_text):
+    """
+    Run the question-generation chain and return its text plus token usage,
+    in a plain form the record/replay archive can store.
+    """
+    message = chain.invoke(prompt_text)
+    usage = getattr(message, "usage_metadata", None) or {}
+    return {
+        "content": message.content,
+        "usage": {"input_tokens": usage.get("input_tokens", 0), "output_tokens": usage.get("output_tokens", 0)},
+    }
+
 
 class PromptingRAGQuestions:
     def __init__(self, vector_db=None, top_k=5):
         """
         Stateless RAG for generating interview questions
         """
+        from langchain_core.prompts import ChatPromptTemplate
+        from langchain_community.vectorstores import FAISS
+
         self.delimiter = "####"
         self.top_k = top_k
-        self.llm = ChatOpenAI(model="gpt-4o-mini", temperature = 0.0)
 
         # Default to empty FAISS if no vector DB is provided
         if vector_db is None:
-            embedding_model = OpenAIEmbeddings()
-            self.vector_db = FAISS.from_texts([""], embedding_model)
+            with span("embed.default_index"):
+                self.vector_db = FAISS.from_texts([""], get_embeddings())
         else:
             self.vector_db = vector_db
 
@@ -68,7 +134,9 @@ Output: [
         )
 
         # Retrieve top-k relevant documents from vector store
-        retrieved_docs = self.retriever.get_relevant_documents(user_input)
+        with span("faiss_search", top_k=self.top_k) as attrs:
+            retrieved_docs = self.retriever.get_relevant_documents(user_input)
+            attrs["docs"] = len(retrieved_docs)
         domain_info_plain = "\n".join(doc.page_content for doc in retrieved_docs)
         domain_info = f"""
 # Inject Domain Information
@@ -83,18 +151,38 @@ Here is the retrieved passage:
         return full_prompt
 
     def generate_questions(self, role, additional_note=""):
+        from langchain_core.runnables import RunnablePassthrough
+
         prompt_text = self._generate_prompt(role, additional_note)
 
-        # Run through LLM
-        rag_chain = RunnablePassthrough() | self.prompt | self.llm | StrOutputParser()
-        response = rag_chain.invoke(prompt_text)
+        # Run through LLM (model, budget and temperature come from the "question_generation" route)
+        route = choose_route("question_generation")
+        llm = get_chat_model(route["provider"], route["model"], route["temperature"], route["max_tokens"])
+        rag_chain = RunnablePassthrough() | self.prompt | llm
+        model = route["model"]
+        t0 = time.perf_counter()
+        usage = None
+        try:
+            with span("model_call.question_generation", prompt_chars=len(prompt_text)) as attrs:
+                result = invoke_question_chain(rag_chain, model, prompt_text)
+                tokens = result["usage"]
+                usage = SimpleNamespace(prompt_tokens=tokens["input_tokens"], completion_tokens=tokens["output_tokens"])
+                attrs["model"] = model
+                attrs["prompt_tokens"] = tokens["input_tokens"]
+                attrs["completion_tokens"] = tokens["output_tokens"]
+                MODEL_TOKENS.inc(tokens["input_tokens"], model=model, kind="prompt")
+                MODEL_TOKENS.inc(tokens["output_tokens"], model=model, kind="completion")
+        finally:
+            observe("question_generation", model, time.perf_counter() - t0, usage, route)
+        response = result["content"]
 
         # Parse JSON safely
-        try:
-            questions_list = json.loads(response)
-            if isinstance(questions_list, list):
-                # Keep only 'question' fields
-                return [{"question": q.get("question", "").strip()} for q in questions_list]
-        except Exception:
-            # Fallback: single-question list
-            return [{"question": response.strip()}]
+        with span("parse.questions"):
+            try:
+                questions_list = json.loads(response)
+                if isinstance(questions_list, list):
+                    # Keep only 'question' fields
+                    return [{"question": q.get("question", "").strip()} for q in questions_list]
+            except Exception:
+                # Fallback: single-question list
+                return [{"question": response.strip()}]
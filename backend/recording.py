@@ -0,0 +1,231 @@
+# recording.py
+"""
+Record/replay of model calls.
+
+MODEL_RECORD_MODE=record  stores every wrapped call (request, response, duration)
+                          in a single SQLite archive; audio and other byte payloads
+                          are stored once as compressed, content-addressed blobs.
+MODEL_RECORD_MODE=replay  serves those responses back without touching the network,
+                          either with the original timing or as fast as possible
+                          (MODEL_REPLAY_TIMING=original|fast).
+"""
+import functools
+import hashlib
+import inspect
+import json
+import sqlite3
+import threading
+import time
+import zlib
+from config import MODEL_RECORD_MODE, MODEL_ARCHIVE_PATH, MODEL_REPLAY_TIMING
+
+try:
+    import zstandard
+except ImportError:  # zlib keeps the archive usable without zstandard
+    zstandard = None
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS blobs (
+    digest TEXT PRIMARY KEY,
+    codec  TEXT NOT NULL,
+    size   INTEGER NOT NULL,
+    data   BLOB NOT NULL
+);
+CREATE TABLE IF NOT EXISTS calls (
+    id            INTEGER PRIMARY KEY AUTOINCREMENT,
+    kind          TEXT NOT NULL,
+    key           TEXT NOT NULL,
+    request       TEXT NOT NULL,
+    response_type TEXT NOT NULL,
+    response      TEXT NOT NULL,
+    duration      REAL NOT NULL,
+    created       REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS calls_kind_key ON calls (kind, key, id);
+"""
+
+
+class ReplayMissError(LookupError):
+    """Raised in replay mode when the archive has no recording for a call."""
+
+
+def _compress(data: bytes):
+    if zstandard is not None:
+        return "zstd", zstandard.ZstdCompressor(level=10).compress(data)
+    return "zlib", zlib.compress(data, 9)
+
+
+def _decompress(codec: str, data: bytes) -> bytes:
+    if codec == "zstd":
+        if zstandard is None:
+            raise RuntimeError("archive blob is zstd-compressed but zstandard is not installed")
+        return zstandard.ZstdDecompressor().decompress(data)
+    if codec == "zlib":
+        return zlib.decompress(data)
+    return data
+
+
+class ModelCallArchive:
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.executescript(SCHEMA)
+        self._replay_cursor = {}
+
+    # ---- blobs ---- #
+    def put_blob(self, data: bytes) -> str:
+        digest = hashlib.sha256(data).hexdigest()
+        with self._lock:
+            exists = self._conn.execute("SELECT 1 FROM blobs WHERE digest = ?", (digest,)).fetchone()
+            if not exists:
+                codec, packed = _compress(data)
+                self._conn.execute(
+                    "INSERT INTO blobs (digest, codec, size, data) VALUES (?, ?, ?, ?)",
+                    (digest, codec, len(data), packed),
+                )
+                self._conn.commit()
+        return digest
+
+    def get_blob(self, digest: str) -> bytes:
+        with self._lock:
+            row = self._conn.execute("SELECT codec, data FROM blobs WHERE digest = ?", (digest,)).fetchone()
+        if row is None:
+            raise ReplayMissError(f"blob {digest} missing from archive")
+        return _decompress(row[0], row[1])
+
+    # ---- calls ---- #
+    def record(self, kind, key, request, response, duration):
+        response_type, encoded = self._encode_response(response)
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO calls (kind, key, request, response_type, response, duration, created) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (kind, key, json.dumps(request, sort_keys=True), response_type, encoded, duration, time.time()),
+            )
+            self._conn.commit()
+
+    def lookup(self, kind, key):
+        """
+        Return (response, duration) for the next recording of this call.
+        Repeated identical calls are served in recording order; once exhausted
+        the last recording is reused.
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT response_type, response, duration FROM calls WHERE kind = ? AND key = ? ORDER BY id",
+                (kind, key),
+            ).fetchall()
+            if not rows:
+                raise ReplayMissError(f"no recorded {kind} call for key {key[:12]}")
+            position = self._replay_cursor.get((kind, key), 0)
+            self._replay_cursor[(kind, key)] = position + 1
+        response_type, encoded, duration = rows[min(position, len(rows) - 1)]
+        return self._decode_response(response_type, encoded), duration
+
+    def stats(self):
+        with self._lock:
+            calls = self._conn.execute(
+                "SELECT kind, COUNT(*), SUM(duration) FROM calls GROUP BY kind ORDER BY kind"
+            ).fetchall()
+            blobs = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0), COALESCE(SUM(LENGTH(data)), 0) FROM blobs").fetchone()
+        return {
+            "calls": {kind: {"count": count, "recorded_seconds": round(total or 0.0, 3)} for kind, count, total in calls},
+            "blobs": {"count": blobs[0], "raw_bytes": blobs[1], "stored_bytes": blobs[2]},
+        }
+
+    def _encode_response(self, response):
+        if isinstance(response, (bytes, bytearray)):
+            return "blob", self.put_blob(bytes(response))
+        if isinstance(response, str):
+            return "text", response
+        return "json", json.dumps(response)
+
+    def _decode_response(self, response_type, encoded):
+        if response_type == "blob":
+            return self.get_blob(encoded)
+        if response_type == "text":
+            return encoded
+        return json.loads(encoded)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+_archive = None
+_archive_lock = threading.Lock()
+
+
+def get_archive():
+    global _archive
+    if _archive is None:
+        with _archive_lock:
+            if _archive is None:
+                _archive = ModelCallArchive(MODEL_ARCHIVE_PATH)
+    return _archive
+
+
+def _normalize(value, archive):
+    """
+    Make call arguments JSON-serializable; byte payloads become blob references.
+    """
+    if isinstance(value, (bytes, bytearray)):
+        if archive is not None and MODEL_RECORD_MODE == "record":
+            return {"$blob": archive.put_blob(bytes(value)), "size": len(value)}
+        return {"$blob": hashlib.sha256(value).hexdigest(), "size": len(value)}
+    if isinstance(value, dict):
+        return {str(k): _normalize(v, archive) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_normalize(v, archive) for v in value]
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    return repr(value)
+
+
+def recorded(kind, ignore=()):
+    """
+    Decorator that records or replays a model call depending on MODEL_RECORD_MODE.
+    Calls are keyed by `kind` plus their bound arguments (minus `ignore`, e.g.
+    client objects); byte arguments are keyed by content hash.
+    """
+    def decorator(fn):
+        signature = inspect.signature(fn)
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if MODEL_RECORD_MODE not in ("record", "replay"):
+                return fn(*args, **kwargs)
+
+            archive = get_archive()
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            request = {
+                name: _normalize(value, archive)
+                for name, value in bound.arguments.items()
+                if name not in ignore
+            }
+            key = hashlib.sha256(json.dumps({"kind": kind, "args": request}, sort_keys=True).encode("utf-8")).hexdigest()
+
+            if MODEL_RECORD_MODE == "replay":
+                response, duration = archive.lookup(kind, key)
+                if MODEL_REPLAY_TIMING == "original":
+                    time.sleep(duration)
+                return response
+
+            t0 = time.perf_counter()
+            response = fn(*args, **kwargs)
+            archive.record(kind, key, request, response, time.perf_counter() - t0)
+            return response
+
+        return wrapper
+    return decorator
+
+
+if __name__ == "__main__":
+    import os
+    import sys
+    path = sys.argv[1] if len(sys.argv) > 1 else MODEL_ARCHIVE_PATH
+    if not os.path.exists(path):
+        sys.exit(f"no archive at {path}")
+    print(json.dumps(ModelCallArchive(path).stats(), indent=2))
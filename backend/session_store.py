@@ -0,0 +1,192 @@
+# session_store.py
+"""
+Storage for saved interview sessions.
+
+The in-memory store matches the original single-process demo. When
+SESSION_DB_PATH is set (the multi-worker gunicorn config sets it), sessions
+go to SQLite so every worker sees the same history.
+
+Both stores keep the progress analytics document (see analytics.py) next to
+the sessions and update it in the same lock/transaction as each insert.
+"""
+import copy
+import json
+import os
+import sqlite3
+import threading
+from config import SESSION_DB_PATH
+from analytics import build_analytics, update_analytics, public_view
+
+# Seed data shown on the history page of a fresh install (for demo purposes)
+DEMO_SESSIONS = [
+    {
+        'timestamp': '2025-10-24T15:30:00',
+        'total_score': 4,
+        'questions': [
+            {
+                'question': 'Tell me about yourself?',
+                'response': 'I am a software engineer with 5 years of experience...',
+                'analysis_content': 'Good explanation of experience and skills.',
+                'analysis_delivery': 'Clear voice, moderate pace.',
+                'score': 8
+            },
+            {
+                'question': 'What are your strengths?',
+                'response': 'I am highly analytical and detail-oriented...',
+                'analysis_content': 'Strong examples provided.',
+                'analysis_delivery': 'Slightly fast pace but understandable.',
+                'score': 7
+            },
+            {
+                'question': 'Describe a challenge you overcame.',
+                'response': 'In my last project, we faced a tight deadline...',
+                'analysis_content': 'Well-structured story, shows problem-solving.',
+                'analysis_delivery': 'Good pacing and clarity.',
+                'score': 0
+            }
+        ],
+        'overall_summary': 'Strong content, maintain steady pace in answers. Overall excellent performance.'
+    }
+]
+
+
+class MemorySessionStore:
+    def __init__(self):
+        self._sessions = copy.deepcopy(DEMO_SESSIONS)
+        self._analytics = build_analytics(self._sessions)
+        self._lock = threading.Lock()
+
+    def add(self, session):
+        with self._lock:
+            self._sessions.append(session)
+            update_analytics(self._analytics, session)
+
+    def all(self):
+        with self._lock:
+            return list(self._sessions)
+
+    def count(self):
+        with self._lock:
+            return len(self._sessions)
+
+    def page(self, limit, offset=0):
+        """
+        Up to `limit` sessions, newest first, skipping the `offset` newest.
+        """
+        with self._lock:
+            newest_first = self._sessions[::-1]
+        return newest_first[offset:offset + limit]
+
+    def find(self, timestamp):
+        with self._lock:
+            for session in reversed(self._sessions):
+                if session.get("timestamp") == timestamp:
+                    return session
+        return None
+
+    def analytics(self):
+        with self._lock:
+            return copy.deepcopy(public_view(self._analytics))
+
+
+class SQLiteSessionStore:
+    def __init__(self, path):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._local = threading.local()
+        conn = self._connect()
+        conn.execute("CREATE TABLE IF NOT EXISTS sessions (id INTEGER PRIMARY KEY AUTOINCREMENT, data TEXT NOT NULL)")
+        conn.execute("CREATE TABLE IF NOT EXISTS analytics (id INTEGER PRIMARY KEY CHECK (id = 1), data TEXT NOT NULL)")
+        # Seed once; BEGIN IMMEDIATE keeps two workers from both seeding
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if conn.execute("SELECT COUNT(*) FROM sessions").fetchone()[0] == 0:
+                conn.executemany("INSERT INTO sessions (data) VALUES (?)", [(json.dumps(s),) for s in DEMO_SESSIONS])
+            # Databases created before analytics existed are backfilled once
+            if conn.execute("SELECT COUNT(*) FROM analytics").fetchone()[0] == 0:
+                self._write_analytics(conn, build_analytics(self._read_sessions(conn)))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def _connect(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    @staticmethod
+    def _read_sessions(conn):
+        rows = conn.execute("SELECT data FROM sessions ORDER BY id").fetchall()
+        return [json.loads(r[0]) for r in rows]
+
+    @staticmethod
+    def _read_analytics(conn):
+        row = conn.execute("SELECT data FROM analytics WHERE id = 1").fetchone()
+        return json.loads(row[0]) if row else None
+
+    @staticmethod
+    def _write_analytics(conn, doc):
+        conn.execute("INSERT OR REPLACE INTO analytics (id, data) VALUES (1, ?)", (json.dumps(doc),))
+
+    def add(self, session):
+        # Insert + analytics update in one write transaction so concurrent
+        # workers never lose an update or see a half-applied session
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute("INSERT INTO sessions (data) VALUES (?)", (json.dumps(session),))
+            doc = self._read_analytics(conn)
+            if doc is None:
+                doc = build_analytics(self._read_sessions(conn))
+            else:
+                update_analytics(doc, session)
+            self._write_analytics(conn, doc)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def all(self):
+        return self._read_sessions(self._connect())
+
+    def count(self):
+        return self._connect().execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
+
+    def page(self, limit, offset=0):
+        rows = self._connect().execute(
+            "SELECT data FROM sessions ORDER BY id DESC LIMIT ? OFFSET ?", (limit, offset)
+        ).fetchall()
+        return [json.loads(r[0]) for r in rows]
+
+    def find(self, timestamp):
+        row = self._connect().execute(
+            "SELECT data FROM sessions WHERE json_extract(data, '$.timestamp') = ? ORDER BY id DESC LIMIT 1",
+            (timestamp,),
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def analytics(self):
+        doc = self._read_analytics(self._connect())
+        if doc is None:
+            doc = build_analytics(self.all())
+        return public_view(doc)
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_session_store():
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = SQLiteSessionStore(SESSION_DB_PATH) if SESSION_DB_PATH else MemorySessionStore()
+    return _store
@@ -0,0 +1,362 @@
+# shared_cache.py
+"""
+Cache tier shared by every worker process on a host.
+
+Values live in one SQLite database (WAL mode, memory-mapped reads) under
+CACHE_DIR, so TTS audio, resume indexes and LLM responses are generated once
+and read by all workers. get_or_create() adds cross-process single-flight:
+the first caller to miss a key takes a lease row for that key and produces the
+value, while concurrent misses for the same key poll until it appears. Misses
+on other keys never wait for each other.
+
+flight_lock() is a short exclusive section (read-modify-write of a small
+entry) across threads and workers. Locks use a fixed set of LOCK_STRIPES
+files, not one file per key, so they must never be held across model calls.
+
+The file is bounded: every CACHE_PURGE_EVERY writes (per process) expired rows
+are deleted and, above CACHE_MAX_BYTES, the least recently used rows are
+evicted.
+
+Every namespace is scoped to the model endpoints and record mode in use
+(see cache_scope()), so benchmark and --mock runs against the mock server, or
+replayed archives, never fill the production cache with fake audio and text.
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from config import CACHE_DIR, CACHE_MAX_BYTES, CACHE_PURGE_EVERY, BOSON_API_BASE, MODEL_RECORD_MODE
+
+try:
+    import fcntl
+except ImportError:  # Windows: fall back to per-process locking
+    fcntl = None
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS cache (
+    namespace TEXT NOT NULL,
+    key       TEXT NOT NULL,
+    value     BLOB NOT NULL,
+    created   REAL NOT NULL,
+    expires   REAL,
+    size      INTEGER NOT NULL DEFAULT 0,
+    accessed  REAL NOT NULL DEFAULT 0,
+    PRIMARY KEY (namespace, key)
+);
+CREATE INDEX IF NOT EXISTS cache_expires ON cache (expires);
+CREATE TABLE IF NOT EXISTS leases (
+    namespace TEXT NOT NULL,
+    key       TEXT NOT NULL,
+    owner     TEXT NOT NULL,
+    expires   REAL NOT NULL,
+    PRIMARY KEY (namespace, key)
+);
+"""
+# Added after the first release; older cache files are migrated in place
+MIGRATIONS = (
+    ("size", "ALTER TABLE cache ADD COLUMN size INTEGER NOT NULL DEFAULT 0", "UPDATE cache SET size = length(value)"),
+    ("accessed", "ALTER TABLE cache ADD COLUMN accessed REAL NOT NULL DEFAULT 0", "UPDATE cache SET accessed = created"),
+)
+
+MMAP_SIZE = 256 * 1024 * 1024
+LOCK_STRIPES = 64
+# Hits refresh the LRU timestamp at most this often, so reads rarely write
+ACCESS_RESOLUTION_SECONDS = 60
+# Eviction frees down to this fraction of CACHE_MAX_BYTES to avoid evicting on every write
+EVICT_TO = 0.9
+# A producer lease outlives the slowest model call; a crashed holder's lease expires
+LEASE_SECONDS = 300
+# Waiters poll for the value, backing off up to the max interval
+LEASE_POLL_SECONDS = 0.05
+LEASE_POLL_MAX_SECONDS = 0.5
+
+
+def make_key(*parts) -> str:
+    """
+    Stable key from arbitrary JSON-serializable parts (bytes are hashed).
+    """
+    h = hashlib.sha256()
+    for part in parts:
+        if isinstance(part, (bytes, bytearray)):
+            h.update(b"b:" + hashlib.sha256(part).digest())
+        else:
+            h.update(b"j:" + json.dumps(part, sort_keys=True, default=str).encode("utf-8"))
+        h.update(b"\x00")
+    return h.hexdigest()
+
+
+def cache_scope():
+    """
+    Short tag for where cached values come from: both model base URLs plus
+    whether they are replayed from an archive.
+    """
+    openai_base = os.getenv("OPENAI_BASE_URL", "https://api.openai.com/v1")
+    mode = "replay" if MODEL_RECORD_MODE == "replay" else "live"
+    return make_key(BOSON_API_BASE.rstrip("/"), openai_base.rstrip("/"), mode)[:12]
+
+
+class SharedCache:
+    def __init__(self, directory=CACHE_DIR, max_bytes=CACHE_MAX_BYTES, purge_every=CACHE_PURGE_EVERY, scope=None):
+        self.directory = directory
+        self.scope = cache_scope() if scope is None else scope
+        self.max_bytes = max_bytes
+        self.purge_every = purge_every
+        self.lock_dir = os.path.join(directory, "locks")
+        os.makedirs(self.lock_dir, exist_ok=True)
+        self._remove_legacy_lock_files()
+        self.path = os.path.join(directory, "cache.sqlite")
+        self._local = threading.local()
+        # Only used without fcntl; flock() on separate fds also excludes threads
+        self._thread_locks = [threading.Lock() for _ in range(LOCK_STRIPES)]
+        self._writes = 0
+        self._writes_lock = threading.Lock()
+        conn = self._connect()
+        conn.executescript(SCHEMA)
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(cache)")}
+        for column, alter, backfill in MIGRATIONS:
+            if column not in columns:
+                try:
+                    conn.execute(alter)
+                    conn.execute(backfill)
+                except sqlite3.OperationalError:
+                    pass  # another worker migrated first
+        self.purge()
+
+    def _remove_legacy_lock_files(self):
+        # Earlier versions left one <sha256>.lock file per key behind
+        for name in os.listdir(self.lock_dir):
+            if len(name) == 69 and name.endswith(".lock"):
+                try:
+                    os.remove(os.path.join(self.lock_dir, name))
+                except OSError:
+                    pass
+
+    def _connect(self):
+        """
+        One connection per thread and per process: sqlite connections must not
+        cross a fork, so a pid change (pre-fork workers) opens a fresh one.
+        """
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(f"PRAGMA mmap_size={MMAP_SIZE}")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    # ---- raw bytes ---- #
+    def _scoped(self, namespace):
+        return f"{self.scope}:{namespace}" if self.scope else namespace
+
+    def get(self, namespace, key):
+        namespace = self._scoped(namespace)
+        conn = self._connect()
+        row = conn.execute(
+            "SELECT value, expires, accessed FROM cache WHERE namespace = ? AND key = ?", (namespace, key)
+        ).fetchone()
+        if row is None:
+            return None
+        value, expires, accessed = row
+        now = time.time()
+        if expires is not None and expires < now:
+            return None
+        if now - accessed > ACCESS_RESOLUTION_SECONDS:
+            conn.execute("UPDATE cache SET accessed = ? WHERE namespace = ? AND key = ?", (now, namespace, key))
+        return bytes(value)
+
+    def set(self, namespace, key, value: bytes, ttl=None):
+        namespace = self._scoped(namespace)
+        now = time.time()
+        expires = now + ttl if ttl else None
+        self._connect().execute(
+            "INSERT OR REPLACE INTO cache (namespace, key, value, created, expires, size, accessed) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (namespace, key, sqlite3.Binary(value), now, expires, len(value), now),
+        )
+        with self._writes_lock:
+            self._writes += 1
+            due = self.purge_every > 0 and self._writes % self.purge_every == 0
+        if due:
+            self.purge()
+
+    def delete(self, namespace, key):
+        namespace = self._scoped(namespace)
+        self._connect().execute("DELETE FROM cache WHERE namespace = ? AND key = ?", (namespace, key))
+
+    def items(self, namespace):
+        """
+        All unexpired (key, value) pairs in a namespace.
+        """
+        rows = self._connect().execute(
+            "SELECT key, value FROM cache WHERE namespace = ? AND (expires IS NULL OR expires >= ?)",
+            (self._scoped(namespace), time.time()),
+        ).fetchall()
+        return [(key, bytes(value)) for key, value in rows]
+
+    def purge_expired(self):
+        conn = self._connect()
+        conn.execute("DELETE FROM leases WHERE expires < ?", (time.time(),))
+        return conn.execute(
+            "DELETE FROM cache WHERE expires IS NOT NULL AND expires < ?", (time.time(),)
+        ).rowcount
+
+    def evict_lru(self, max_bytes=None):
+        """
+        Delete least recently used rows until the cache holds at most
+        EVICT_TO * max_bytes. Returns the number of rows evicted.
+        """
+        max_bytes = self.max_bytes if max_bytes is None else max_bytes
+        if not max_bytes:
+            return 0
+        conn = self._connect()
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM cache").fetchone()[0]
+        if total <= max_bytes:
+            return 0
+        excess = total - int(max_bytes * EVICT_TO)
+        victims = []
+        for namespace, key, size in conn.execute("SELECT namespace, key, size FROM cache ORDER BY accessed"):
+            victims.append((namespace, key))
+            excess -= size
+            if excess <= 0:
+                break
+        conn.executemany("DELETE FROM cache WHERE namespace = ? AND key = ?", victims)
+        return len(victims)
+
+    def purge(self):
+        """
+        Drop expired rows, then enforce the size cap. Returns (expired, evicted).
+        """
+        return self.purge_expired(), self.evict_lru()
+
+    # ---- JSON helpers ---- #
+    def get_json(self, namespace, key):
+        value = self.get(namespace, key)
+        return None if value is None else json.loads(value)
+
+    def set_json(self, namespace, key, value, ttl=None):
+        self.set(namespace, key, json.dumps(value).encode("utf-8"), ttl=ttl)
+
+    def update_json(self, namespace, key, update, ttl=None):
+        """
+        Replace a JSON value with update(current or None) in one SQLite write
+        transaction and return the new value. Takes no flight lock, so it is
+        safe to call from inside a get_or_create() producer.
+        """
+        scoped = self._scoped(namespace)
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            now = time.time()
+            row = conn.execute(
+                "SELECT value, expires FROM cache WHERE namespace = ? AND key = ?", (scoped, key)
+            ).fetchone()
+            current = json.loads(row[0]) if row and (row[1] is None or row[1] >= now) else None
+            value = update(current)
+            data = json.dumps(value).encode("utf-8")
+            conn.execute(
+                "INSERT OR REPLACE INTO cache (namespace, key, value, created, expires, size, accessed) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (scoped, key, sqlite3.Binary(data), now, now + ttl if ttl else None, len(data), now),
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return value
+
+    # ---- single-flight ---- #
+    @contextmanager
+    def flight_lock(self, namespace, key):
+        """
+        Exclusive lock for one cache entry across threads and worker processes.
+        Keys hash onto LOCK_STRIPES shared lock files, so holders must not nest
+        flight locks (two keys may share a stripe).
+        """
+        stripe = int(make_key(namespace, key)[:8], 16) % LOCK_STRIPES
+        if fcntl is None:
+            with self._thread_locks[stripe]:
+                yield
+            return
+        path = os.path.join(self.lock_dir, f"stripe-{stripe:02d}.lock")
+        with open(path, "a+b") as fh:
+            fcntl.flock(fh.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(fh.fileno(), fcntl.LOCK_UN)
+
+    def _acquire_lease(self, namespace, key):
+        """
+        Take the producer lease for one key. Returns the owner token, or None if
+        another caller holds an unexpired lease.
+        """
+        scoped, owner, now = self._scoped(namespace), uuid.uuid4().hex, time.time()
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute("DELETE FROM leases WHERE namespace = ? AND key = ? AND expires < ?", (scoped, key, now))
+            acquired = conn.execute(
+                "INSERT OR IGNORE INTO leases (namespace, key, owner, expires) VALUES (?, ?, ?, ?)",
+                (scoped, key, owner, now + LEASE_SECONDS),
+            ).rowcount
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return owner if acquired else None
+
+    def _release_lease(self, namespace, key, owner):
+        self._connect().execute(
+            "DELETE FROM leases WHERE namespace = ? AND key = ? AND owner = ?", (self._scoped(namespace), key, owner)
+        )
+
+    def get_or_create(self, namespace, key, producer, ttl=None):
+        """
+        Return cached bytes for (namespace, key), calling producer() at most once
+        across all workers when the entry is missing. Only callers missing the
+        same key wait; if the producer fails, the next waiter takes over.
+        """
+        value = self.get(namespace, key)
+        if value is not None:
+            return value
+        delay = LEASE_POLL_SECONDS
+        while True:
+            owner = self._acquire_lease(namespace, key)
+            if owner is not None:
+                try:
+                    # Another caller may have finished between our miss and the lease
+                    value = self.get(namespace, key)
+                    if value is None:
+                        value = producer()
+                        self.set(namespace, key, value, ttl=ttl)
+                    return value
+                finally:
+                    self._release_lease(namespace, key, owner)
+            time.sleep(delay)
+            delay = min(delay * 2, LEASE_POLL_MAX_SECONDS)
+            value = self.get(namespace, key)
+            if value is not None:
+                return value
+
+    def get_or_create_json(self, namespace, key, producer, ttl=None):
+        raw = self.get_or_create(namespace, key, lambda: json.dumps(producer()).encode("utf-8"), ttl=ttl)
+        return json.loads(raw)
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_cache():
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = SharedCache()
+    return _cache
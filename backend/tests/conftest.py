@@ -0,0 +1,6 @@
+# tests/conftest.py
+import os
+import sys
+
+# The backend modules are imported flat (python app.py is run from backend/)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
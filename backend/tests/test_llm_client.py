@@ -0,0 +1,39 @@
+# tests/test_llm_client.py
+from llm_client import parse_question_analysis, parse_interview_summary
+
+
+def test_question_analysis_dict_keeps_unicode_and_quotes():
+    result = {"analysis_content": 'Good — it’s "we"', "analysis_delivery": "Calm", "score": 8}
+    assert parse_question_analysis(result) == {
+        "analysis_content": 'Good — it’s "we"',
+        "analysis_delivery": "Calm",
+        "score": 8,
+    }
+
+
+def test_question_analysis_dict_in_any_key_order():
+    result = {"score": 7, "analysis_content": "a", "analysis_delivery": "b"}
+    assert parse_question_analysis(result) == {"analysis_content": "a", "analysis_delivery": "b", "score": 7}
+
+
+def test_question_analysis_from_thinking_text():
+    text = 'reasoning...</think>\n{"analysis_content": "a", "analysis_delivery": "b", "score": 6}'
+    assert parse_question_analysis({"text": text}) == {"analysis_content": "a", "analysis_delivery": "b", "score": 6}
+
+
+def test_question_analysis_regex_fallback_for_broken_json():
+    text = '</think>{"analysis_content": "a", "analysis_delivery": "b", "score": 5,'
+    assert parse_question_analysis({"text": text})["score"] == 5
+
+
+def test_interview_summary_dict_joins_lists():
+    result = {"overall_score": 7, "strengths": ["Clear — concise"], "weaknesses": [], "tips": ["a", "b"]}
+    summary = parse_interview_summary(result)
+    assert summary["strengths"] == "Clear — concise"
+    assert summary["tips"] == "a<br>b"
+    assert summary["overall_score"] == 7
+
+
+def test_interview_summary_from_thinking_text():
+    summary = parse_interview_summary({"text": '...</think>{"strengths": ["x"], "tips": []}'})
+    assert summary["strengths"] == "x"
@@ -0,0 +1,94 @@
+# tests/test_shared_cache.py
+import threading
+import model_router
+import shared_cache
+from shared_cache import SharedCache
+
+
+def run_with_timeout(fn, seconds=10):
+    result = []
+    thread = threading.Thread(target=lambda: result.append(fn()), daemon=True)
+    thread.start()
+    thread.join(seconds)
+    assert not thread.is_alive(), "deadlocked"
+    return result[0]
+
+
+def test_latency_window_update_inside_producer_on_same_stripe(tmp_path, monkeypatch):
+    # One stripe makes every key collide, like an unlucky prompt does with 64
+    monkeypatch.setattr(shared_cache, "LOCK_STRIPES", 1)
+    cache = SharedCache(str(tmp_path))
+    monkeypatch.setattr(shared_cache, "_cache", cache)
+    windows = model_router.SharedWindows()
+
+    def producer():
+        # call_llm -> complete() -> observe() records latency while the value is produced
+        windows.append("analyze_question", "model-a", 0.5)
+        return b"answer"
+
+    assert run_with_timeout(lambda: cache.get_or_create("llm", "prompt", producer)) == b"answer"
+    assert windows.values("analyze_question", "model-a") == [0.5]
+
+
+def test_shared_window_keeps_newest_samples(tmp_path, monkeypatch):
+    monkeypatch.setattr(shared_cache, "_cache", SharedCache(str(tmp_path)))
+    monkeypatch.setattr(model_router, "ROUTE_LATENCY_WINDOW", 3)
+    windows = model_router.SharedWindows()
+    for seconds in (1.0, 2.0, 3.0, 4.0):
+        windows.append("summary", "model-a", seconds)
+    assert windows.values("summary", "model-a") == [2.0, 3.0, 4.0]
+    windows.clear("summary", "model-a")
+    assert windows.values("summary", "model-a") == []
+
+
+def test_misses_on_different_keys_do_not_wait_for_each_other(tmp_path, monkeypatch):
+    monkeypatch.setattr(shared_cache, "LOCK_STRIPES", 1)
+    cache = SharedCache(str(tmp_path))
+    both_running = threading.Barrier(2, timeout=5)
+
+    def producer():
+        both_running.wait()  # raises BrokenBarrierError if the producers are serialized
+        return b"value"
+
+    threads = [threading.Thread(target=cache.get_or_create, args=("llm", key, producer)) for key in ("a", "b")]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(10)
+    assert cache.get("llm", "a") == b"value" and cache.get("llm", "b") == b"value"
+
+
+def test_concurrent_misses_on_one_key_produce_once(tmp_path):
+    cache = SharedCache(str(tmp_path))
+    calls = []
+    started = threading.Event()
+
+    def producer():
+        calls.append(1)
+        started.set()
+        threading.Event().wait(0.3)
+        return b"value"
+
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(cache.get_or_create("tts", "k", producer))) for _ in range(4)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(10)
+    assert results == [b"value"] * 4
+    assert len(calls) == 1
+
+
+def test_failed_producer_releases_the_lease(tmp_path):
+    cache = SharedCache(str(tmp_path))
+
+    def failing():
+        raise RuntimeError("model down")
+
+    try:
+        cache.get_or_create("llm", "k", failing)
+    except RuntimeError:
+        pass
+    assert run_with_timeout(lambda: cache.get_or_create("llm", "k", lambda: b"ok"), seconds=2) == b"ok"
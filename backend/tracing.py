@@ -0,0 +1,283 @@
+# tracing.py
+import json
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from config import TRACE_DIR, SHARED_WORKER_STATE, METRICS_PUBLISH_SECONDS, METRICS_SNAPSHOT_TTL
+
+# Histogram buckets in seconds, wide enough for model calls on slow networks
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+_lock = threading.Lock()
+_local = threading.local()
+
+
+class Histogram:
+    """
+    Minimal Prometheus-style histogram keyed by a tuple of label values.
+    Kept in-process so it works offline without prometheus_client.
+    """
+
+    def __init__(self, name, help_text, label_names, buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = tuple(label_names)
+        self.buckets = tuple(buckets)
+        self._series = {}
+
+    def observe(self, value, **labels):
+        key = tuple(str(labels.get(n, "")) for n in self.label_names)
+        with _lock:
+            series = self._series.get(key)
+            if series is None:
+                series = {"counts": [0] * len(self.buckets), "sum": 0.0, "count": 0}
+                self._series[key] = series
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series["counts"][i] += 1
+            series["sum"] += value
+            series["count"] += 1
+
+    def snapshot(self):
+        with _lock:
+            return {k: dict(v, counts=list(v["counts"])) for k, v in self._series.items()}
+
+    @staticmethod
+    def merge(total, series):
+        if total is None:
+            return dict(series, counts=list(series["counts"]))
+        total["counts"] = [a + b for a, b in zip(total["counts"], series["counts"])]
+        total["sum"] += series["sum"]
+        total["count"] += series["count"]
+        return total
+
+    def render(self, series_by_key=None):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        if series_by_key is None:
+            series_by_key = self.snapshot()
+        for key, series in sorted(series_by_key.items()):
+            base = _format_labels(self.label_names, key)
+            for bound, count in zip(self.buckets, series["counts"]):
+                lines.append(f'{self.name}_bucket{_format_labels(self.label_names, key, le=_fmt(bound))} {count}')
+            lines.append(f'{self.name}_bucket{_format_labels(self.label_names, key, le="+Inf")} {series["count"]}')
+            lines.append(f"{self.name}_sum{base} {series['sum']:.6f}")
+            lines.append(f"{self.name}_count{base} {series['count']}")
+        return "\n".join(lines)
+
+
+class Counter:
+    def __init__(self, name, help_text, label_names):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = tuple(label_names)
+        self._series = {}
+
+    def inc(self, amount=1, **labels):
+        key = tuple(str(labels.get(n, "")) for n in self.label_names)
+        with _lock:
+            self._series[key] = self._series.get(key, 0) + amount
+
+    def snapshot(self):
+        with _lock:
+            return dict(self._series)
+
+    @staticmethod
+    def merge(total, value):
+        return value if total is None else total + value
+
+    def render(self, series_by_key=None):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        if series_by_key is None:
+            series_by_key = self.snapshot()
+        for key, value in sorted(series_by_key.items()):
+            lines.append(f"{self.name}{_format_labels(self.label_names, key)} {value}")
+        return "\n".join(lines)
+
+
+def _fmt(value):
+    return repr(float(value))
+
+
+def _escape(value):
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names, values, le=None):
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if le is not None:
+        pairs.append(f'le="{le}"')
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+# -------------------- Registry -------------------- #
+REQUEST_DURATION = Histogram(
+    "interview_request_duration_seconds", "HTTP request latency by endpoint.", ["endpoint", "method", "status"]
+)
+STAGE_DURATION = Histogram(
+    "interview_stage_duration_seconds", "Latency of individual backend stages.", ["stage"]
+)
+STAGE_ERRORS = Counter(
+    "interview_stage_errors_total", "Stages that raised an exception.", ["stage"]
+)
+MODEL_TOKENS = Counter(
+    "interview_model_tokens_total", "Tokens reported by model calls.", ["model", "kind"]
+)
+
+TASK_DURATION = Histogram(
+    "interview_task_duration_seconds", "Model latency per routed task and model.", ["task", "model"]
+)
+TASK_TOKENS = Counter(
+    "interview_task_tokens_total", "Tokens used per routed task and model.", ["task", "model", "kind"]
+)
+TASK_FALLBACKS = Counter(
+    "interview_task_fallbacks_total", "Calls routed to a fallback model after an SLO breach.", ["task", "model"]
+)
+
+FOLLOWUP_OUTCOMES = Counter(
+    "interview_followup_speculations_total", "Speculative follow-up jobs by outcome.", ["outcome"]
+)
+
+REGISTRY = [
+    REQUEST_DURATION, STAGE_DURATION, STAGE_ERRORS, MODEL_TOKENS,
+    TASK_DURATION, TASK_TOKENS, TASK_FALLBACKS, FOLLOWUP_OUTCOMES,
+]
+
+
+METRICS_NAMESPACE = "metrics"
+_last_publish = 0.0
+
+
+def publish_metrics(force=False):
+    """
+    With SHARED_WORKER_STATE, store this worker's series in the shared cache
+    (at most every METRICS_PUBLISH_SECONDS unless forced) for render_metrics().
+    """
+    global _last_publish
+    if not SHARED_WORKER_STATE:
+        return
+    now = time.monotonic()
+    if not force and now - _last_publish < METRICS_PUBLISH_SECONDS:
+        return
+    _last_publish = now
+    from shared_cache import get_cache
+    doc = {m.name: [[list(k), v] for k, v in m.snapshot().items()] for m in REGISTRY}
+    get_cache().set_json(METRICS_NAMESPACE, str(os.getpid()), doc, ttl=METRICS_SNAPSHOT_TTL)
+
+
+def _merged_series():
+    from shared_cache import get_cache
+    merged = {m.name: {} for m in REGISTRY}
+    kinds = {m.name: m for m in REGISTRY}
+    for _, raw in get_cache().items(METRICS_NAMESPACE):
+        for name, series in json.loads(raw).items():
+            if name not in kinds:
+                continue
+            for key, value in series:
+                key = tuple(key)
+                merged[name][key] = kinds[name].merge(merged[name].get(key), value)
+    return merged
+
+
+def render_metrics():
+    """
+    Render every registered metric in the Prometheus text exposition format.
+    With SHARED_WORKER_STATE the values are summed over all workers' snapshots
+    (a worker that exited keeps contributing until METRICS_SNAPSHOT_TTL).
+    """
+    if not SHARED_WORKER_STATE:
+        return "\n".join(m.render() for m in REGISTRY) + "\n"
+    publish_metrics(force=True)
+    merged = _merged_series()
+    return "\n".join(m.render(merged[m.name]) for m in REGISTRY) + "\n"
+
+
+# -------------------- Per-request traces -------------------- #
+def start_trace(name):
+    """
+    Begin a trace for the current thread (one per Flask request).
+    """
+    _local.trace = {
+        "trace_id": uuid.uuid4().hex,
+        "name": name,
+        "start": time.time(),
+        "_t0": time.perf_counter(),
+        "spans": [],
+    }
+    return _local.trace
+
+
+def current_trace():
+    return getattr(_local, "trace", None)
+
+
+def end_trace(status=None):
+    """
+    Close the current trace and, if TRACE_DIR is set, write it as JSON.
+    Returns the finished trace dict (or None when no trace was started).
+    """
+    trace = getattr(_local, "trace", None)
+    _local.trace = None
+    if trace is None:
+        return None
+    trace["duration_seconds"] = time.perf_counter() - trace.pop("_t0")
+    trace["status"] = status
+    if TRACE_DIR:
+        try:
+            os.makedirs(TRACE_DIR, exist_ok=True)
+            path = os.path.join(TRACE_DIR, f"{int(trace['start'])}_{trace['trace_id']}.json")
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(trace, f, default=str)
+        except OSError:
+            pass
+    return trace
+
+
+@contextmanager
+def span(stage, **attrs):
+    """
+    Time a block of work as `stage`.
+    Yields a dict the caller can add attributes to (e.g. token counts);
+    they are stored on the request trace alongside the duration.
+    """
+    t0 = time.perf_counter()
+    error = None
+    try:
+        yield attrs
+    except Exception as e:
+        error = e
+        STAGE_ERRORS.inc(stage=stage)
+        raise
+    finally:
+        elapsed = time.perf_counter() - t0
+        STAGE_DURATION.observe(elapsed, stage=stage)
+        trace = getattr(_local, "trace", None)
+        if trace is not None:
+            entry = {"stage": stage, "offset_seconds": t0 - trace["_t0"], "duration_seconds": elapsed}
+            entry.update(attrs)
+            if error is not None:
+                entry["error"] = repr(error)
+            trace["spans"].append(entry)
+
+
+def record_usage(attrs, model, usage):
+    """
+    Copy token counts from an OpenAI-style `usage` object onto span attrs
+    and into the token counter.
+    """
+    attrs["model"] = model
+    if usage is None:
+        return
+    for kind in ("prompt_tokens", "completion_tokens", "total_tokens"):
+        value = getattr(usage, kind, None)
+        if value is None:
+            continue
+        attrs[kind] = value
+        if kind != "total_tokens":
+            MODEL_TOKENS.inc(value, model=model, kind=kind.replace("_tokens", ""))
+    details = getattr(usage, "completion_tokens_details", None)
+    reasoning = getattr(details, "reasoning_tokens", None) if details is not None else None
+    if reasoning:
+        attrs["reasoning_tokens"] = reasoning
+        MODEL_TOKENS.inc(reasoning, model=model, kind="reasoning")
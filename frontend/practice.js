@@ -23,8 +23,29 @@ const questionBar = document.getElementById("question_bar");
 const interviewRole = localStorage.getItem("interviewRole") || "software engineer";
 const ttsVoice = localStorage.getItem("ttsVoice") || "en_woman";
 const interviewNotes = localStorage.getItem("interviewNotes") || "";
+const adaptiveMode = localStorage.getItem("adaptiveMode") === "1";
+
+// Adaptive mode: the last ~30 s of the answer are uploaded every few seconds so
+// the server can prepare a follow-up question before the answer ends
+const PARTIAL_TIMESLICE_MS = 4000;
+const PARTIAL_TAIL_CHUNKS = 8;  // x 4 s, on top of the first chunk (WebM header)
+const FOLLOWUP_WAIT_POLLS = 6;  // x 500 ms, if the last partial is still being processed
+const sessionId = Math.random().toString(36).slice(2, 10);
+let partialSeq = 0;
+let partialInFlight = false;
 
 // === Helpers ===
+// Ask /tts for compressed audio the browser can play; WAV stays the fallback
+function ttsAcceptHeader() {
+  const probe = new Audio();
+  const types = [];
+  if (probe.canPlayType('audio/webm; codecs="opus"')) types.push("audio/webm");
+  if (probe.canPlayType("audio/mpeg")) types.push(types.length ? "audio/mpeg;q=0.9" : "audio/mpeg");
+  types.push("audio/wav;q=0.5");
+  return types.join(", ");
+}
+const TTS_ACCEPT = ttsAcceptHeader();
+
 function updateProgress() {
   const percent = (currentQuestionIndex / questionList.length) * 100;
   progressBar.style.width = `${percent}%`;
@@ -45,10 +66,66 @@ function setNextButtonState(enabled) {
 function addQuestionToBar(index, questionText, done = false) {
   const div = document.createElement("div");
   div.className = "question-item" + (index === currentQuestionIndex ? " active" : "");
-  div.textContent = `Question #${index + 1}: ${questionText}` + (done ? " ✅" : "");
+  const mainNumber = questionList.slice(0, index + 1).filter(q => !q.is_followup).length;
+  const label = questionList[index] && questionList[index].is_followup ? "Follow-up" : `Question #${mainNumber}`;
+  div.textContent = `${label}: ${questionText}` + (done ? " ✅" : "");
   questionBar.appendChild(div);
 }
 
+function renderQuestionBar() {
+  questionBar.innerHTML = "";
+  questionList.forEach((q, idx) => addQuestionToBar(idx, q.question, Boolean(currentQuestions[idx])));
+}
+
+function answerSlot(index) {
+  return `${sessionId}-${index}`;
+}
+
+// === Adaptive follow-ups ===
+async function sendPartialAnswer(index) {
+  // Skip while an upload is running; the next timeslice includes this audio anyway
+  if (partialInFlight) return;
+  partialInFlight = true;
+  const fd = new FormData();
+  // Only the container header plus the newest chunks, so each upload stays bounded
+  const tail = recordedChunks.length > PARTIAL_TAIL_CHUNKS + 1
+    ? [recordedChunks[0], ...recordedChunks.slice(-PARTIAL_TAIL_CHUNKS)]
+    : recordedChunks;
+  fd.append("file", new Blob(tail, { type: "audio/webm" }), "partial.webm");
+  fd.append("slot", answerSlot(index));
+  fd.append("seq", String(++partialSeq));
+  fd.append("question", questionList[index].question);
+  fd.append("role", interviewRole);
+  fd.append("voice", ttsVoice);
+  try {
+    // Accept picks the audio format the follow-up is pre-synthesized in, as for /tts
+    await fetch("/partial_answer", { method: "POST", headers: { "Accept": TTS_ACCEPT }, body: fd });
+  } catch (e) {
+    console.error(e);
+  } finally {
+    partialInFlight = false;
+  }
+}
+
+async function queueFollowup(index) {
+  const slot = answerSlot(index);
+  try {
+    let state = null;
+    for (let i = 0; i < FOLLOWUP_WAIT_POLLS; i++) {
+      state = await (await fetch(`/followup?slot=${slot}`)).json();
+      if (state.status !== "pending") break;
+      await new Promise(resolve => setTimeout(resolve, 500));
+    }
+    const followup = state && state.followup;
+    await fetch(`/followup?slot=${slot}&used=${followup ? 1 : 0}`, { method: "DELETE" });
+    if (!followup) return;
+    questionList.splice(index + 1, 0, { question: followup.question, is_followup: true });
+    renderQuestionBar();
+  } catch (e) {
+    console.error(e);
+  }
+}
+
 // === Load questions on page load ===
 document.addEventListener("DOMContentLoaded", async () => {
   const savedQuestions = localStorage.getItem("generatedQuestions");
@@ -59,8 +136,7 @@ document.addEventListener("DOMContentLoaded", async () => {
   }
 
   if (questionList.length > 0) {
-    questionBar.innerHTML = "";
-    questionList.forEach((q, idx) => addQuestionToBar(idx, q.question));
+    renderQuestionBar();
     await showQuestion(currentQuestionIndex);
   }
 });
@@ -113,7 +189,7 @@ async function showQuestion(index) {
   try {
     const ttsResp = await fetch("/tts", {
       method: "POST",
-      headers: { "Content-Type": "application/json" },
+      headers: { "Content-Type": "application/json", "Accept": TTS_ACCEPT },
       body: JSON.stringify({ text: qObj.question, voice: ttsVoice }),
     });
     const blob = await ttsResp.blob();
@@ -190,11 +266,19 @@ btnStart.onclick = async () => {
   btnStart.disabled = true;
   btnStop.disabled = false;
   recordedChunks = [];
+  partialSeq = 0;
+  const answerIndex = currentQuestionIndex;
+  const speculate = adaptiveMode && !questionList[answerIndex].is_followup;
   try {
     const stream = await navigator.mediaDevices.getUserMedia({ audio: true });
     mediaRecorder = new MediaRecorder(stream);
-    mediaRecorder.ondataavailable = e => e.data.size > 0 && recordedChunks.push(e.data);
-    mediaRecorder.start();
+    mediaRecorder.ondataavailable = e => {
+      if (e.data.size > 0) recordedChunks.push(e.data);
+      // The final chunk arrives after stop; the follow-up is needed now, not after another round-trip
+      if (speculate && mediaRecorder.state === "recording") sendPartialAnswer(answerIndex);
+    };
+    if (speculate) mediaRecorder.start(PARTIAL_TIMESLICE_MS);
+    else mediaRecorder.start();
   } catch (e) {
     alert("Could not start recording: " + e.message);
     btnStart.disabled = false;
@@ -217,6 +301,9 @@ btnStop.onclick = async () => {
       const uploadData = await uploadResp.json();
       const transcript = uploadData.transcript || "—";
       transcriptPre.textContent = transcript;
+      if (uploadData.analysis && uploadData.analysis.capped) {
+        transcriptPre.textContent += `\n\n(Only the first ${Math.round(uploadData.analysis.speech_seconds)} s of this answer were analyzed.)`;
+      }
 
       // 2. Analyze question via LLM
       const qText = questionList[currentQuestionIndex].question;
@@ -233,8 +320,10 @@ btnStop.onclick = async () => {
 `.trim();
 
       // Store result for interview summary
+      const isFollowup = Boolean(questionList[currentQuestionIndex].is_followup);
       currentQuestions[currentQuestionIndex] = {
         question: qText,
+        is_followup: isFollowup,
         response: transcript,
         analysis_content: analysisData.analysis_content,
         analysis_delivery: analysisData.analysis_delivery,
@@ -243,6 +332,9 @@ btnStop.onclick = async () => {
 
       // Mark question as done
       questionBar.children[currentQuestionIndex].textContent += " ✅";
+
+      // Adaptive mode: the follow-up prepared while answering becomes the next question
+      if (adaptiveMode && !isFollowup) await queueFollowup(currentQuestionIndex);
       setNextButtonState(true);
     } catch (e) {
       console.error(e);